@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of JWT sign/verify throughput: HS256 vs EdDSA (Ed25519),
+each through TokenService with prepared keys, plus cached verification.
+
+    python -m benchmarks.jwt_algorithms --iterations 20000
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from schemas.token_service import SigningKey, TokenService
+
+
+def _eddsa_key() -> SigningKey:
+    private_key = Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return SigningKey("ed", "EdDSA", private_pem, public_pem)
+
+
+def _rate(iterations: int, fn) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - started)
+
+
+def run(iterations: int) -> dict:
+    payload = {
+        "sub": "student@example.com",
+        "roles": ["student"],
+        "scope": "access",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    keys = {
+        "HS256": SigningKey("hs", "HS256", "benchmark-secret", "benchmark-secret"),
+        "EdDSA": _eddsa_key(),
+    }
+    results = {}
+    for name, key in keys.items():
+        service = TokenService({key.kid: key}, key.kid, cache_size=10)
+        token = service.encode(payload)
+        uncached = TokenService({key.kid: key}, key.kid, cache_size=0)
+        results[name] = {
+            "sign_per_s": round(_rate(iterations, lambda: service.encode(payload))),
+            "verify_per_s": round(_rate(iterations, lambda: uncached.decode(token))),
+            "cached_verify_per_s": round(_rate(iterations, lambda: service.decode(token))),
+            "token_bytes": len(token),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT HS256 vs EdDSA throughput")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10}{'sign/s':>12}{'verify/s':>12}{'cached/s':>12}{'bytes':>8}")
+    for name, stats in run(args.iterations).items():
+        print(f"{name:<10}{stats['sign_per_s']:>12}{stats['verify_per_s']:>12}"
+              f"{stats['cached_verify_per_s']:>12}{stats['token_bytes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
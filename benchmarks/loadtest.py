@@ -0,0 +1,240 @@
+"""
+Offline load test for the auth and application flows.
+
+Boots main.app in-process against mongomock-motor and the fake SMTP backend,
+then drives register -> (verify-code) -> login -> submit-application -> admin
+listing for many virtual students and reports throughput and p50/p95/p99 per
+endpoint. Nothing leaves the machine.
+
+    pip install -r requirements.txt && pip install -r requirements-dev.txt
+    python -m benchmarks.loadtest --users 200 --concurrency 20
+
+Errors logged by the app while the test runs (e.g. a failed stats write
+that the request path swallows) are counted and reported; the run exits
+non-zero if there were any, since the timings would then exclude work.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+os.environ["MONGO_URL"] = "mongomock://localhost"
+os.environ["MAIL_BACKEND"] = "fake"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("CHECK_QUERY_PLANS_ON_STARTUP", "false")
+
+import httpx
+from main import app
+from config.db import users_collection, verification_collection
+from schemas.auth_schema import hash_password_async
+
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-admin-password"
+
+APPLICATION = {
+    "educational": {
+        "highestQualification": {
+            "type": "Bachelors",
+            "school": "Benchmark University",
+            "board": "State",
+            "year": "2024",
+            "percentage": "82",
+        },
+        "previousQualifications": [],
+    },
+    "studyPreferences": {
+        "preferredCountry": "UK",
+        "preferredCourse": "Computer Science",
+        "preferredIntakeMonth": "September",
+        "preferredIntakeYear": "2026",
+        "degreeLevel": "Masters",
+    },
+    "certifications": {"hasCertifications": False},
+    "workExperience": {"hasExperience": False},
+}
+
+
+class BackendErrors(logging.Handler):
+    """Counts ERROR records per logger, keeping the first message of each."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.counts: dict[str, int] = defaultdict(int)
+        self.first: dict[str, str] = {}
+
+    def emit(self, record: logging.LogRecord):
+        self.counts[record.name] += 1
+        if record.name not in self.first:
+            message = record.getMessage()
+            if record.exc_info and record.exc_info[1] is not None:
+                message += f" ({type(record.exc_info[1]).__name__}: {record.exc_info[1]})"
+            self.first[record.name] = message
+
+    def report(self) -> dict:
+        return {name: {"count": count, "first": self.first[name]} for name, count in self.counts.items()}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            report[name] = {
+                "requests": len(ordered),
+                "errors": self.errors[name],
+                "rps": round(len(ordered) / elapsed, 2),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+            }
+        return report
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _create_admin():
+    await users_collection.insert_one({
+        "_id": str(uuid.uuid4()),
+        "userId": str(uuid.uuid4()),
+        "name": "Benchmark Admin",
+        "email": ADMIN_EMAIL,
+        "password": await hash_password_async(ADMIN_PASSWORD),
+        "roles": ["admin"],
+        "created_at": datetime.utcnow(),
+    })
+
+
+async def student_flow(client: httpx.AsyncClient, recorder: Recorder, index: int):
+    email = f"student{index}-{uuid.uuid4().hex[:8]}@example.com"
+    password = f"password-{index}"
+    response = await recorder.call(client, "register", "POST", "/register", json={
+        "name": f"Student {index}",
+        "email": email,
+        "contactnumber": "9999999999",
+        "password": password,
+        "security_questions": {"first_school": "Bench School", "date_of_birth": "2000-01-01"},
+    })
+
+    if response.status_code == 202 and "access_token" not in response.json():
+        pending = await verification_collection.find_one({"_id": email})
+        if pending is not None:
+            await recorder.call(client, "verify-code", "POST", "/verify-code",
+                                data={"email": email, "code": pending["code"]})
+
+    response = await recorder.call(client, "login", "POST", "/login",
+                                   data={"username": email, "password": password})
+    if response.status_code != 200:
+        return
+    token = response.json()["access_token"]
+
+    await recorder.call(client, "submit-application", "POST", "/submit-application",
+                        json=APPLICATION, headers=_bearer(token))
+    await recorder.call(client, "student-applications", "GET", "/student/applications",
+                        headers=_bearer(token))
+
+
+async def admin_flow(client: httpx.AsyncClient, recorder: Recorder, pages: int):
+    response = await recorder.call(client, "admin-login", "POST", "/login",
+                                   data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    token = response.json()["access_token"]
+    cursor = None
+    for _ in range(pages):
+        params = {"limit": 50}
+        if cursor:
+            params["cursor"] = cursor
+        response = await recorder.call(client, "admin-students", "GET", "/admin/students/",
+                                       params=params, headers=_bearer(token))
+        cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+        if not cursor:
+            break
+
+
+async def run(users: int, concurrency: int, admin_pages: int) -> dict:
+    recorder = Recorder()
+    backend_errors = BackendErrors()
+    logging.getLogger().addHandler(backend_errors)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(index: int):
+        async with slots:
+            await student_flow(client, recorder, index)
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await _create_admin()
+                started = time.perf_counter()
+                await asyncio.gather(*(bounded(index) for index in range(users)))
+                await admin_flow(client, recorder, admin_pages)
+                elapsed = time.perf_counter() - started
+    finally:
+        logging.getLogger().removeHandler(backend_errors)
+
+    return {"users": users, "concurrency": concurrency, "elapsed_s": round(elapsed, 3),
+            "endpoints": recorder.report(elapsed), "backend_errors": backend_errors.report()}
+
+
+def _print_table(result: dict):
+    print(f"{result['users']} users, concurrency {result['concurrency']}, {result['elapsed_s']} s")
+    header = f"{'endpoint':<22}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<22}{stats['requests']:>7}{stats['errors']:>6}{stats['rps']:>9}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    if result["backend_errors"]:
+        print("\nBackend errors logged during the run (timings exclude the failed work):")
+        for name, errors in result["backend_errors"].items():
+            print(f"  {name}: {errors['count']} x {errors['first']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--admin-pages", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.users, args.concurrency, args.admin_pages))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_table(result)
+    if result["backend_errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
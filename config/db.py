@@ -1,7 +1,25 @@
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
-from config.getenv_var import MONGO_URL
+from config.getenv_var import (
+    MONGO_URL, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS
+)
+from config.metrics import mongo_command_listener
 
-db_client = AsyncIOMotorClient(MONGO_URL)
+if MONGO_URL and MONGO_URL.startswith("mongomock://"):
+    # In-process fake used by the benchmark suite; not for production.
+    from mongomock_motor import AsyncMongoMockClient
+    db_client = AsyncMongoMockClient()
+else:
+    db_client = AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[mongo_command_listener],
+    )
 db = db_client.ahatin
 
 users_collection = db.users
@@ -9,4 +27,19 @@ verification_collection = db.verification_collection
 applications_collection = db.applications
 deleted_users_collection = db.deleted_users
 deleted_applications_collection = db.deleted_applications
+application_stats_collection = db.application_stats
+rate_limits_collection = db.rate_limits
+idempotency_collection = db.idempotency_keys
+sessions_collection = db.sessions
+audit_log_collection = db.audit_log
 
+
+async def ping_db() -> float:
+    """Round-trips a ping to the server and returns the latency in ms."""
+    started = time.perf_counter()
+    await db.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
+def close_db():
+    db_client.close()
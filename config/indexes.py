@@ -0,0 +1,152 @@
+"""
+Index declarations for every collection, applied at startup.
+
+Run `python -m config.indexes` to create them by hand, or
+`python -m config.indexes --check` to explain() each hot query and fail
+if any of them would fall back to a collection scan.
+"""
+import asyncio
+import sys
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.collation import Collation, CollationStrength
+from config.db import (
+    users_collection, applications_collection, verification_collection,
+    deleted_users_collection, deleted_applications_collection, rate_limits_collection,
+    idempotency_collection, sessions_collection, audit_log_collection
+)
+from config.getenv_var import VERIFICATION_RETENTION_SECONDS, IDEMPOTENCY_TTL_SECONDS
+
+
+# Case-insensitive collation shared by the admin search indexes and queries.
+SEARCH_COLLATION = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
+INDEXES = [
+    (users_collection, [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("userId", ASCENDING)], name="userId_unique", unique=True),
+        IndexModel(
+            [("roles", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="roles_created_at_id",
+        ),
+        IndexModel([("name", ASCENDING)], name="name_ci", collation=SEARCH_COLLATION),
+        IndexModel([("email", ASCENDING)], name="email_ci", collation=SEARCH_COLLATION),
+        IndexModel([("contactnumber", ASCENDING)], name="contactnumber_ci", collation=SEARCH_COLLATION),
+    ]),
+    (applications_collection, [
+        IndexModel([("applicationId", ASCENDING)], name="applicationId_unique", unique=True),
+        IndexModel([("userId", ASCENDING), ("submitted_at", DESCENDING)], name="userId_submitted_at"),
+        IndexModel(
+            [
+                ("educational.highestQualification.school", TEXT),
+                ("studyPreferences.preferredCourse", TEXT),
+                ("studyPreferences.preferredUniversities", TEXT),
+                ("studyPreferences.preferredCountry", TEXT),
+            ],
+            name="application_text",
+            weights={
+                "studyPreferences.preferredCourse": 5,
+                "studyPreferences.preferredUniversities": 3,
+                "educational.highestQualification.school": 2,
+                "studyPreferences.preferredCountry": 1,
+            },
+        ),
+    ]),
+    (verification_collection, [
+        # Expired codes are kept for a grace period so /resend-code can still
+        # find the pending registration after the 5 minute OTP window.
+        IndexModel(
+            [("expires_at", ASCENDING)],
+            name="expires_at_ttl",
+            expireAfterSeconds=VERIFICATION_RETENTION_SECONDS,
+        ),
+    ]),
+    (rate_limits_collection, [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]),
+    (idempotency_collection, [
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS,
+        ),
+    ]),
+    (sessions_collection, [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("family", ASCENDING)], name="family"),
+    ]),
+    (audit_log_collection, [
+        IndexModel(
+            [("entity", ASCENDING), ("entity_id", ASCENDING), ("at", DESCENDING), ("_id", DESCENDING)],
+            name="entity_at_id",
+        ),
+        IndexModel([("at", DESCENDING), ("_id", DESCENDING)], name="at_id"),
+        IndexModel([("actor", ASCENDING), ("at", DESCENDING), ("_id", DESCENDING)], name="actor_at_id"),
+    ]),
+    (deleted_users_collection, [
+        IndexModel([("userId", ASCENDING)], name="userId"),
+    ]),
+    (deleted_applications_collection, [
+        IndexModel([("applicationId", ASCENDING)], name="applicationId"),
+        IndexModel([("userId", ASCENDING)], name="userId"),
+    ]),
+]
+
+# Query shapes used by the routes; each must be answered from an index.
+QUERY_SHAPES = [
+    (users_collection, {"email": "probe@example.com"}, None),
+    (users_collection, {"userId": "probe"}, None),
+    (users_collection, {"roles": "student"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    (applications_collection, {"applicationId": "probe"}, None),
+    (applications_collection, {"userId": "probe"}, [("submitted_at", DESCENDING)]),
+    (verification_collection, {"_id": "probe@example.com"}, None),
+    (audit_log_collection, {"entity": "application", "entity_id": "probe"}, [("at", DESCENDING), ("_id", DESCENDING)]),
+    (audit_log_collection, {}, [("at", DESCENDING), ("_id", DESCENDING)]),
+]
+
+
+async def ensure_indexes():
+    for collection, models in INDEXES:
+        await collection.create_indexes(models)
+
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def check_query_plans() -> list[str]:
+    """
+    Returns a description of every query shape whose winning plan contains a
+    COLLSCAN; an empty list means all hot queries are index-backed.
+    """
+    failures = []
+    for collection, query, sort in QUERY_SHAPES:
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            failures.append(f"{collection.name}: {query} sort={sort}")
+    return failures
+
+
+async def _main(argv: list[str]):
+    await ensure_indexes()
+    print("Indexes ensured.")
+    if "--check" in argv:
+        failures = await check_query_plans()
+        for failure in failures:
+            print(f"COLLSCAN: {failure}")
+        if failures:
+            sys.exit(1)
+        print("All query shapes use an index.")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI
+from config.db import ping_db, close_db
+from config.indexes import ensure_indexes, check_query_plans
+from config.getenv_var import (
+    ENSURE_INDEXES_ON_STARTUP, CHECK_QUERY_PLANS_ON_STARTUP, APPLICATION_CHANGE_STREAMS,
+    SHUTDOWN_DRAIN_SECONDS
+)
+from schemas.auth_schema import warm_up_auth
+from schemas.events import watch_application_changes
+from schemas.password_hashing import password_hasher
+from schemas.send_emails import mail_queue
+from schemas.audit import audit_log
+from schemas.stats import seed_stats
+
+logger = logging.getLogger("ahatin.lifespan")
+
+
+class AppState:
+    """Process-wide readiness, read by the /health endpoints."""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+
+
+app_state = AppState()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    latency = await ping_db()
+    logger.info("MongoDB reachable (%.1f ms)", latency)
+
+    if ENSURE_INDEXES_ON_STARTUP:
+        await ensure_indexes()
+    if CHECK_QUERY_PLANS_ON_STARTUP:
+        failures = await check_query_plans()
+        if failures:
+            raise RuntimeError(f"Queries without index support: {failures}")
+
+    await seed_stats()
+    await warm_up_auth()
+    mail_queue.start()
+    audit_log.start()
+    watcher = asyncio.create_task(watch_application_changes()) if APPLICATION_CHANGE_STREAMS else None
+    app_state.ready = True
+
+    try:
+        yield
+    finally:
+        app_state.ready = False
+        app_state.draining = True
+        if watcher is not None:
+            watcher.cancel()
+            # A crashed watcher must not skip the rest of the shutdown.
+            with suppress(asyncio.CancelledError, Exception):
+                await watcher
+        await mail_queue.stop(timeout=SHUTDOWN_DRAIN_SECONDS)
+        await audit_log.stop(timeout=SHUTDOWN_DRAIN_SECONDS)
+        password_hasher.shutdown()
+        close_db()
@@ -1,10 +1,10 @@
 import asyncio
 import uuid
 from getpass import getpass
-from passlib.context import CryptContext
 from datetime import datetime
 from config.db import users_collection
-from schemas.auth_schema import hash_password
+from schemas.auth_schema import hash_password_async
+from schemas.password_hashing import password_hasher
 
 async def create_admin_user():
     print("🔐 Admin User Creation")
@@ -29,7 +29,7 @@ async def create_admin_user():
         "name": name,
         "email": email,
         "contactnumber": contactnumber,
-        "password": hash_password(password),
+        "password": await hash_password_async(password),
         "roles": ["admin"],
         "created_at": datetime.utcnow(),
     }
@@ -38,4 +38,7 @@ async def create_admin_user():
     print("✅ Admin user created successfully.")
 
 if __name__ == "__main__":
-    asyncio.run(create_admin_user())
+    try:
+        asyncio.run(create_admin_user())
+    finally:
+        password_hasher.shutdown()
@@ -0,0 +1,206 @@
+"""
+Bulk student import.
+
+    python import_students.py students.csv [--chunk-size 500] [--workers 4] [--errors errors.ndjson]
+
+Reads CSV (columns: name, email, contactnumber, password, first_school,
+date_of_birth[, roles]) or NDJSON (RegisterUser-shaped objects) as a stream,
+validates each row with RegisterUser, hashes passwords on a process pool,
+skips emails that already exist (one $in query per chunk) and inserts the
+rest with unordered insert_many batches.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Iterator
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from config.db import users_collection
+from models.auth_models import RegisterUser, ALLOWED_ROLES
+from schemas.password_hashing import PasswordHasher
+
+
+def _read_rows(path: str, report: "ImportReport") -> Iterator[tuple[int, dict]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    report.read += 1
+                    report.error(line_no, None, f"Invalid JSON: {e}")
+                    continue
+                if not isinstance(record, dict):
+                    report.read += 1
+                    report.error(line_no, None, "Row is not a JSON object")
+                    continue
+                yield line_no, record
+            return
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            record = {
+                "name": row.get("name") or None,
+                "email": row.get("email"),
+                "contactnumber": row.get("contactnumber") or None,
+                "password": row.get("password"),
+                "security_questions": {
+                    "first_school": row.get("first_school"),
+                    "date_of_birth": row.get("date_of_birth"),
+                },
+            }
+            if row.get("roles"):
+                record["roles"] = [role.strip() for role in row["roles"].split(";") if role.strip()]
+            yield line_no, record
+
+
+def _chunks(rows: Iterator[tuple[int, dict]], size: int) -> Iterator[list[tuple[int, dict]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportReport:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors: list[dict] = []
+        self.started = time.perf_counter()
+
+    def error(self, line: int, email, reason: str):
+        self.errors.append({"line": line, "email": email, "error": reason})
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.read / elapsed if elapsed else 0
+        return (f"read {self.read}, inserted {self.inserted}, duplicates {self.duplicates}, "
+                f"errors {len(self.errors)} in {elapsed:.1f}s ({rate:.0f} rows/s)")
+
+
+async def _import_chunk(chunk: list[tuple[int, dict]], hasher: PasswordHasher, seen: set,
+                        report: ImportReport, dry_run: bool):
+    valid = []
+    for line, record in chunk:
+        report.read += 1
+        try:
+            user = RegisterUser(**record)
+        except (ValidationError, TypeError) as e:
+            report.error(line, record.get("email") if isinstance(record, dict) else None, str(e).splitlines()[0])
+            continue
+        user.email = user.email.lower()
+        bad_roles = [role for role in user.roles if role.lower() not in ALLOWED_ROLES]
+        if bad_roles:
+            report.error(line, user.email, f"Invalid roles: {bad_roles}")
+            continue
+        if user.email in seen:
+            report.duplicates += 1
+            report.error(line, user.email, "Duplicate email in file")
+            continue
+        seen.add(user.email)
+        valid.append((line, user))
+
+    if not valid:
+        return
+
+    existing = await users_collection.find(
+        {"email": {"$in": [user.email for _, user in valid]}},
+        {"_id": 0, "email": 1}
+    ).to_list(length=None)
+    existing_emails = {doc["email"] for doc in existing}
+    fresh = []
+    for line, user in valid:
+        if user.email in existing_emails:
+            report.duplicates += 1
+            report.error(line, user.email, "User already exists")
+        else:
+            fresh.append((line, user))
+    if not fresh:
+        return
+
+    hashes = await asyncio.gather(*(hasher.hash(user.password) for _, user in fresh))
+    now = datetime.utcnow()
+    documents = [
+        {
+            "_id": str(uuid.uuid4()),
+            "userId": str(uuid.uuid4()),
+            "name": user.name,
+            "email": user.email,
+            "contactnumber": user.contactnumber,
+            "password": hashed,
+            "roles": user.roles,
+            "security_questions": {
+                "first_school": user.security_questions.first_school,
+                "dob": user.security_questions.date_of_birth,
+            },
+            "created_at": now,
+            "updated_at": now,
+            "is_active": True,
+        }
+        for (_, user), hashed in zip(fresh, hashes)
+    ]
+    if dry_run:
+        report.inserted += len(documents)
+        return
+
+    try:
+        result = await users_collection.insert_many(documents, ordered=False)
+        report.inserted += len(result.inserted_ids)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        report.inserted += e.details.get("nInserted", 0)
+        for index, error in failed.items():
+            line, user = fresh[index]
+            if error.get("code") == 11000:
+                report.duplicates += 1
+            report.error(line, user.email, error.get("errmsg", "Write failed"))
+
+
+async def import_students(path: str, chunk_size: int, workers: int, dry_run: bool) -> ImportReport:
+    hasher = PasswordHasher(executor="process", workers=workers, max_pending=chunk_size)
+    report = ImportReport()
+    seen: set[str] = set()
+    try:
+        for chunk in _chunks(_read_rows(path, report), chunk_size):
+            await _import_chunk(chunk, hasher, seen, report, dry_run)
+            print(f"… {report.summary()}", file=sys.stderr)
+    finally:
+        hasher.shutdown()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import students from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--errors", help="Write per-row errors to this NDJSON file")
+    parser.add_argument("--dry-run", action="store_true", help="Validate, dedupe and hash without inserting")
+    args = parser.parse_args()
+
+    report = asyncio.run(import_students(args.path, args.chunk_size, args.workers, args.dry_run))
+    print(f"✅ {report.summary()}")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            for error in report.errors:
+                f.write(json.dumps(error) + "\n")
+    elif report.errors:
+        for error in report.errors[:20]:
+            print(f"❌ line {error['line']} ({error['email']}): {error['error']}")
+        if len(report.errors) > 20:
+            print(f"… and {len(report.errors) - 20} more (use --errors to save them all)")
+
+
+if __name__ == "__main__":
+    main()
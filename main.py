@@ -1,13 +1,37 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import auth, user_data, forms, admin
+from routes import auth, user_data, forms, admin, metrics, health, verification_route
+from config.metrics import MetricsMiddleware
+from config.compression import CompressionMiddleware
+from config.lifespan import lifespan
+from schemas.responses import BSONResponse, register_bson_encoders
+from config.getenv_var import (
+    REGISTRATION_MODE, COMPRESSION_ENABLED, COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE,
+    GZIP_LEVEL, BROTLI_QUALITY
+)
 
-app = FastAPI()
+
+register_bson_encoders()
+
+app = FastAPI(lifespan=lifespan, default_response_class=BSONResponse)
 
 app.include_router(auth.router)
+if REGISTRATION_MODE == "email_verification":
+    app.include_router(verification_route.router)
 app.include_router(user_data.router)
 app.include_router(forms.router)
 app.include_router(admin.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=COMPRESSION_ENCODINGS,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,4 +39,6 @@ app.add_middleware(
     allow_credentials = True,
     allow_methods = ["*"],
     allow_headers = ["*"]
-)
\ No newline at end of file
+)
+
+app.add_middleware(MetricsMiddleware)
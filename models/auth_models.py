@@ -59,3 +59,6 @@ class SecurityQuestionsVerify(BaseModel):
 class ResetPasswordRequest(BaseModel):
     email: EmailStr
     new_password: str
+
+class BulkDeleteUsers(BaseModel):
+    userIds: List[str]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
 
 class HighestQualification(BaseModel):
     type: str
@@ -57,5 +57,30 @@ class ApplicationForm(BaseModel):
     workExperience: Optional[WorkExperience] = None
     financialInformation: Optional[FinancialInformation] = None
 
+class ApplicationOut(ApplicationForm):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    applicationId: str
+    userId: str
+    status: str
+    version: Optional[int] = None
+    submitted_at: Optional[str] = None
+    updatedAt: Optional[str] = None
+    updated_at: Optional[str] = None
+
 class StatusUpdate(BaseModel):
-    status: str
\ No newline at end of file
+    status: str
+
+class BulkStatusFilter(BaseModel):
+    status: Optional[str] = None
+    userId: Optional[str] = None
+
+class BulkStatusUpdate(BaseModel):
+    status: str
+    applicationIds: Optional[List[str]] = None
+    filter: Optional[BulkStatusFilter] = None
+
+class ApplicationPatch(BaseModel):
+    version: int
+    changes: Dict[str, Any]
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status as http_status, Path
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status as http_status, Path
 from bson import ObjectId
-from config.db import users_collection, applications_collection, deleted_users_collection
-from models.form_models import StatusUpdate, ApplicationForm
-from schemas.auth_schema import requires_roles
+from pymongo import ReturnDocument
+from config.db import users_collection, applications_collection, audit_log_collection
+from models.auth_models import BulkDeleteUsers, User
+from models.form_models import StatusUpdate, ApplicationForm, BulkStatusUpdate, ApplicationPatch
+from schemas.auth_schema import get_current_user, requires_roles, session_store
+from schemas.user_cache import user_cache
+from schemas.pagination import encode_cursor, keyset_after, prefix_regex
 from datetime import datetime
 from typing import Optional
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from schemas.export import export_ndjson, export_csv
+from schemas.archive import archive_users
+from schemas.events import ADMIN_TOPIC, publish_application_event, sse_stream
+from schemas.application_patch import apply_application_patch
+from schemas.responses import BSONResponse
+from config.indexes import SEARCH_COLLATION
+from schemas.search import search, STUDENT_FIELDS, STUDENT_PROJECTION, APPLICATION_PROJECTION
+from schemas.stats import STATS_PROJECTION, apply_stats_changes, get_stats, rebuild_stats
+from schemas.fields import APPLICATION_FIELDS, APPLICATION_KEY_FIELDS, sparse_fields
+from schemas.audit import audit_log
 
 
 router = APIRouter(
@@ -13,18 +27,172 @@ router = APIRouter(
     dependencies=[Depends(requires_roles(["admin"]))]
     )
 
-def fix_id(doc):
-    doc["_id"] = str(doc["_id"])
-    return doc
+SEARCH_STUDENT_FIELDS = sparse_fields(
+    set(STUDENT_PROJECTION) - {"_id"},
+    # The ranking score is computed from the matched fields.
+    always=("userId", *STUDENT_FIELDS),
+    alias="student_fields"
+)
+SEARCH_APPLICATION_FIELDS = sparse_fields(
+    set(APPLICATION_PROJECTION) - {"_id"}, always=APPLICATION_KEY_FIELDS, alias="application_fields"
+)
+AUDIT_FIELDS = sparse_fields(
+    {"at", "actor", "action", "entity", "entity_id", "changes", "details"},
+    always=("at", "entity", "entity_id")
+)
+
+STUDENT_LIST_PROJECTION = {
+    "userId": 1,
+    "name": 1,
+    "email": 1,
+    "contactnumber": 1,
+    "roles": 1,
+    "is_active": 1,
+    "email_verified": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
 
 
 @router.get("/students/")
-async def get_all_students():
-    users = await users_collection.find({'roles': 'student'}).to_list(length=None)
-    return [fix_id(user) for user in users]
+async def get_all_students(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    name: Optional[str] = Query(None, description="Name prefix (case-insensitive)"),
+    email: Optional[str] = Query(None, description="Email prefix"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    include_total: bool = False,
+    projection: Optional[dict] = Depends(
+        sparse_fields(set(STUDENT_LIST_PROJECTION), always=("userId", "created_at"))
+    ),
+):
+    query = {"roles": "student"}
+    if name:
+        # Collated range rather than a /^name/i regex, so it is bounded by
+        # the case-insensitive name_ci index.
+        query["name"] = {"$gte": name, "$lt": name + "\uffff"}
+    if email:
+        query["email"] = prefix_regex(email.lower())
+    if created_after or created_before:
+        query["created_at"] = {}
+        if created_after:
+            query["created_at"]["$gte"] = created_after
+        if created_before:
+            query["created_at"]["$lt"] = created_before
+
+    page_query = {"$and": [query, keyset_after("created_at", cursor)]} if cursor else query
+    # Only collate when needed: roles_created_at_id uses the simple collation.
+    collation = SEARCH_COLLATION if name else None
+    users = await users_collection.find(page_query, projection or STUDENT_LIST_PROJECTION, collation=collation) \
+        .sort([("created_at", -1), ("_id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].get("created_at"), users[-1]["_id"])
+
+    response = {
+        "items": users,
+        "next_cursor": next_cursor,
+    }
+    if include_total:
+        response["total"] = await users_collection.count_documents(query, collation=collation)
+    return BSONResponse(response)
+
+@router.get("/export")
+async def export_students(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="students-{stamp}.csv"'}
+        )
+    return StreamingResponse(
+        export_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="students-{stamp}.ndjson"'}
+    )
+
+@router.get("/events")
+async def application_events(request: Request):
+    return StreamingResponse(
+        sse_stream(request, ADMIN_TOPIC),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/search")
+async def search_records(
+    q: str = Query(..., min_length=2, max_length=100),
+    scope: str = Query("all", pattern="^(students|applications|all)$"),
+    page: int = Query(1, ge=1, le=100),
+    limit: int = Query(20, ge=1, le=100),
+    student_projection: Optional[dict] = Depends(SEARCH_STUDENT_FIELDS),
+    application_projection: Optional[dict] = Depends(SEARCH_APPLICATION_FIELDS),
+):
+    return await search(q.strip(), scope, page, limit, {
+        "students": student_projection,
+        "applications": application_projection,
+    })
+
+@router.get("/stats")
+async def get_application_stats():
+    return await get_stats()
+
+@router.post("/stats/rebuild")
+async def rebuild_application_stats():
+    return await rebuild_stats()
+
+@router.get("/audit")
+async def get_audit_log(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    entity: Optional[str] = Query(None, pattern="^(user|application)$"),
+    entity_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    projection: Optional[dict] = Depends(AUDIT_FIELDS),
+):
+    if entity_id and not entity:
+        raise HTTPException(status_code=400, detail="entity_id requires entity.")
+
+    query = {}
+    if entity:
+        query["entity"] = entity
+    if entity_id:
+        query["entity_id"] = entity_id
+    if actor:
+        query["actor"] = actor.lower()
+    if action:
+        query["action"] = action
+    if since or until:
+        query["at"] = {}
+        if since:
+            query["at"]["$gte"] = since
+        if until:
+            query["at"]["$lt"] = until
+
+    page_query = {"$and": [query, keyset_after("at", cursor)]} if cursor else query
+    events = await audit_log_collection.find(page_query, projection) \
+        .sort([("at", -1), ("_id", -1)]) \
+        .limit(limit + 1) \
+        .to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1]["at"], events[-1]["_id"])
+
+    return BSONResponse({"items": events, "next_cursor": next_cursor})
 
 @router.put("/student/{user_id}")
-async def update_user(user_id: str, body: dict):
+async def update_user(user_id: str, body: dict, current_user: User = Depends(get_current_user)):
     name = body.get("name")
     contactnumber = body.get("contactnumber")
 
@@ -36,89 +204,230 @@ async def update_user(user_id: str, body: dict):
 
     if not updates:
         raise HTTPException(status_code=400, detail="No updatable fields provided.")
+    updates["updated_at"] = datetime.utcnow()
 
     result = await users_collection.update_one({"userId": user_id}, {"$set": updates})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    user_cache.invalidate(user_id=user_id)
+    await audit_log.record(
+        "user.update", "user", user_id, current_user.email,
+        changes={key: value for key, value in updates.items() if key != "updated_at"}
+    )
 
     user = await users_collection.find_one({"userId": user_id}, {"password": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return fix_id(user)
+    return BSONResponse(user)
 
 
 @router.delete("/student/{user_id}")
-async def delete_user(user_id: str):
-    user = await users_collection.find_one({"userId": user_id})
-    if not user:
+async def delete_user(user_id: str, current_user: User = Depends(get_current_user)):
+    result = await archive_users([user_id])
+    if not result["users"]:
         raise HTTPException(status_code=404, detail="User not found")
+    user_cache.invalidate(user_id=user_id)
+    await session_store.revoke_users(result["emails"])
+    await audit_log.record(
+        "user.delete", "user", user_id, current_user.email, applications=result["applications"]
+    )
 
-    user["deletedAt"] = datetime.utcnow()
-    await deleted_users_collection.insert_one(user)
+    return {
+        "message": "User and applications moved to deleted collections",
+        "applications": result["applications"],
+        "elapsed_ms": result["elapsed_ms"],
+    }
 
-    result = await users_collection.delete_one({"userId": user_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to delete user")
 
-    return {"message": "User deleted and moved to deleted_users collection"}
+MAX_BULK_DELETE_USERS = 500
+
+@router.post("/students/delete")
+async def delete_users(payload: BulkDeleteUsers, current_user: User = Depends(get_current_user)):
+    user_ids = list(dict.fromkeys(payload.userIds))
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="No userIds provided.")
+    if len(user_ids) > MAX_BULK_DELETE_USERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_DELETE_USERS} users can be deleted at once."
+        )
+
+    result = await archive_users(user_ids)
+    for user_id in result["users"]:
+        user_cache.invalidate(user_id=user_id)
+    await session_store.revoke_users(result["emails"])
+    for user_id in result["users"]:
+        await audit_log.record("user.delete", "user", user_id, current_user.email, bulk=True)
+
+    archived = set(result["users"])
+    return {
+        "deleted": len(archived),
+        "applications": result["applications"],
+        "not_found": [user_id for user_id in user_ids if user_id not in archived],
+        "mode": result["mode"],
+        "elapsed_ms": result["elapsed_ms"],
+    }
 
 
 @router.get("/student/applications/{userId}")
-async def get_student_applications(userId: str):
+async def get_student_applications(
+    userId: str,
+    projection: Optional[dict] = Depends(sparse_fields(APPLICATION_FIELDS, always=APPLICATION_KEY_FIELDS)),
+):
     if not userId:
         raise HTTPException(status_code=401, detail='User not found or authorized')
     
-    applications = await applications_collection.find({"userId": userId}).to_list(length=None)
+    applications = await applications_collection.find({"userId": userId}, projection).to_list(length=None)
     if not applications:
         raise HTTPException(status_code=404, detail="User not found.")
     
-    for doc in applications:
-        doc["_id"] = str(doc["_id"])
-    
-    return applications
+    return BSONResponse(applications)
 
 
 @router.put("/application/{application_id}/status")
-async def update_application_status(application_id: str, payload: dict):
+async def update_application_status(
+    application_id: str, payload: dict, current_user: User = Depends(get_current_user)
+):
     status = payload.get("status")
     if not status:
         raise HTTPException(status_code=400, detail="Status field is required.")
 
     try:
-        result = await applications_collection.update_one(
+        updated_app = await applications_collection.find_one_and_update(
             {"applicationId": application_id},
             {
                 "$set": {
                     "status": status,
                     "updated_at": datetime.utcnow().isoformat()
                 }
-            }
+            },
+            projection={"_id": 0, "applicationId": 1, "userId": 1, "status": 1},
+            return_document=ReturnDocument.BEFORE
         )
 
-        if result.matched_count == 0:
+        if updated_app is None:
             raise HTTPException(status_code=404, detail="Application not found.")
-        updated_app = await applications_collection.find_one({"applicationId": application_id})
+        await apply_stats_changes([(updated_app, {**updated_app, "status": status})])
+        publish_application_event("status", {**updated_app, "status": status})
+        await audit_log.record(
+            "application.status", "application", application_id, current_user.email,
+            changes={"status": {"from": updated_app.get("status"), "to": status}},
+            userId=updated_app.get("userId")
+        )
 
         return JSONResponse(content=updated_app['applicationId'], status_code=200)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+
+MAX_BULK_STATUS_UPDATES = 1000
+
+@router.put("/applications/status")
+async def bulk_update_application_status(
+    payload: BulkStatusUpdate, current_user: User = Depends(get_current_user)
+):
+    if not payload.status:
+        raise HTTPException(status_code=400, detail="Status field is required.")
+    if payload.applicationIds is None and payload.filter is None:
+        raise HTTPException(status_code=400, detail="Provide applicationIds or a filter.")
+
+    if payload.applicationIds is not None:
+        requested = list(dict.fromkeys(payload.applicationIds))
+        query = {"applicationId": {"$in": requested}}
+    else:
+        requested = None
+        query = payload.filter.dict(exclude_none=True)
+        if not query:
+            raise HTTPException(status_code=400, detail="Filter must not be empty.")
+
+    matched = await applications_collection.find(query, {"_id": 0, "applicationId": 1, "userId": 1, "status": 1}) \
+        .limit(MAX_BULK_STATUS_UPDATES + 1) \
+        .to_list(length=MAX_BULK_STATUS_UPDATES + 1)
+    if len(matched) > MAX_BULK_STATUS_UPDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_STATUS_UPDATES} applications can be updated at once."
+        )
+    found_ids = [doc["applicationId"] for doc in matched]
+
+    result = None
+    if found_ids:
+        updated_at = datetime.utcnow().isoformat()
+        result = await applications_collection.update_many(
+            {"applicationId": {"$in": found_ids}},
+            {
+                "$set": {
+                    "status": payload.status,
+                    "updated_at": updated_at
+                }
+            }
+        )
+        await apply_stats_changes([(doc, {**doc, "status": payload.status}) for doc in matched])
+        for doc in matched:
+            publish_application_event("status", {**doc, "status": payload.status, "updated_at": updated_at})
+            await audit_log.record(
+                "application.status", "application", doc["applicationId"], current_user.email,
+                changes={"status": {"from": doc.get("status"), "to": payload.status}},
+                userId=doc.get("userId"), bulk=True
+            )
+
+    found = set(found_ids)
+    results = [
+        {"applicationId": app_id, "result": "updated" if app_id in found else "not_found"}
+        for app_id in (requested if requested is not None else found_ids)
+    ]
+    return {
+        "status": payload.status,
+        "matched": result.matched_count if result else 0,
+        "modified": result.modified_count if result else 0,
+        "results": results,
+    }
+
+
 @router.put("/application/{application_id}/edit")
 async def update_application(
     application_id: str = Path(...),
-    application: ApplicationForm = None
+    application: ApplicationForm = None,
+    current_user: User = Depends(get_current_user)
 ):
-    existing = await applications_collection.find_one({"applicationId": application_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
     updated_data = application.dict()
     updated_data["updated_at"] = datetime.utcnow().isoformat()
 
-    await applications_collection.update_one(
+    updated_app = await applications_collection.find_one_and_update(
         {"applicationId": application_id},
-        {"$set": updated_data}
+        {"$set": updated_data, "$inc": {"version": 1}},
+        projection={"_id": 0, "applicationId": 1, "userId": 1, **STATS_PROJECTION}
+    )
+    if updated_app is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    await apply_stats_changes([(updated_app, {**updated_app, **updated_data})])
+    publish_application_event("updated", {**updated_app, "updated_at": updated_data["updated_at"]})
+    await audit_log.record(
+        "application.edit", "application", application_id, current_user.email,
+        userId=updated_app.get("userId")
+    )
+
+    return {"message": "Application updated successfully"}
+
+
+@router.patch("/application/{application_id}")
+async def patch_application(
+    application_id: str, patch: ApplicationPatch, current_user: User = Depends(get_current_user)
+):
+    before, updated_app = await apply_application_patch(
+        application_id,
+        patch.changes,
+        patch.version,
+        datetime.utcnow().isoformat()
+    )
+    await apply_stats_changes([(before, updated_app)])
+    publish_application_event("updated", updated_app)
+    await audit_log.record(
+        "application.patch", "application", application_id, current_user.email,
+        changes=patch.changes, userId=updated_app.get("userId"), version=updated_app["version"]
     )
 
-    return {"message": "Application updated successfully"}
\ No newline at end of file
+    return {"message": "Application updated successfully", "version": updated_app["version"]}
@@ -1,66 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form
+from fastapi import APIRouter, Depends, HTTPException, Header, status, BackgroundTasks, Form
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import Annotated
+from typing import Annotated, Optional
 from models.auth_models import Token, RefreshTokenRequest, RegisterUser, ALLOWED_ROLES, ForgotPasswordRequest, SecurityQuestionsVerify, ResetPasswordRequest
-from schemas.auth_schema import authenticate_user, ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_DAYS, generate_tokens, hash_password
+from schemas.auth_schema import authenticate_user, ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_DAYS, generate_tokens, hash_password_async, session_store
 from datetime import datetime, timedelta
-from jose import JWTError
-from config.getenv_var import SECRET_KEY, ALGORITHM
+from jwt.exceptions import InvalidTokenError
 from config.db import users_collection, verification_collection
 from schemas.send_emails import send_verification_email
-import jwt
+from schemas.user_cache import user_cache
+from schemas.rate_limit import rate_limit
+from schemas.idempotency import idempotent, secret_digest
+from schemas.token_service import token_service
+from config.getenv_var import REGISTRATION_MODE
 import random
 import uuid
 
 router = APIRouter(tags=["Authentication"])
 
-@router.post("/register", response_model=Token, status_code=status.HTTP_202_ACCEPTED)
-async def start_registration(request: RegisterUser):
+async def start_registration(request: RegisterUser, idempotency_key: Optional[str] = Header(None)):
     try:
         request.email = request.email.lower()
-        for role in request.roles:
-            if role.lower() not in ALLOWED_ROLES:
+        fingerprint = request.model_dump(exclude={"password", "security_questions"})
+        fingerprint["credentials"] = secret_digest(
+            request.password,
+            request.security_questions.first_school,
+            request.security_questions.date_of_birth
+        )
+        async with idempotent("register", idempotency_key, request.email, fingerprint) as idem:
+            if idem.replay is not None:
+                return idem.replay
+
+            for role in request.roles:
+                if role.lower() not in ALLOWED_ROLES:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid role '{role}'. Allowed roles: {list(ALLOWED_ROLES)}"
+                    )
+
+            existing_user = await users_collection.find_one({"email": request.email})
+            if existing_user:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Invalid role '{role}'. Allowed roles: {list(ALLOWED_ROLES)}"
+                    detail=f"User already exist."
                 )
-
-        existing_user = await users_collection.find_one({"email": request.email})
-        if existing_user:
-            raise HTTPException(
-                status_code=400,
-                detail=f"User already exist."
+            hashed_password = await hash_password_async(request.password)
+
+            user_dict = {
+                "_id": str(uuid.uuid4()),
+                "userId": str(uuid.uuid4()),
+                "name": request.name,
+                "email": request.email,
+                "contactnumber": request.contactnumber,
+                "password": hashed_password,
+                "roles": request.roles,
+                "security_questions": {
+                    "first_school": request.security_questions.first_school,
+                    "dob": request.security_questions.date_of_birth
+                },
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
+                "is_active": True
+            }
+
+            await users_collection.insert_one(user_dict)
+            idem.mark_written()
+
+            access_token, refresh_token = await generate_tokens(request.email, request.roles)
+
+            token = Token(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                token_type="bearer",
+                expires_in=ACCESS_TOKEN_EXPIRE_SECONDS,
+                roles=request.roles
             )
-        print(hash_password(request.password))
-
-        user_dict = {
-            "_id": str(uuid.uuid4()),
-            "userId": str(uuid.uuid4()),
-            "name": request.name,
-            "email": request.email,
-            "contactnumber": request.contactnumber,
-            "password": hash_password(request.password),
-            "roles": request.roles,
-            "security_questions": {
-                "first_school": request.security_questions.first_school,
-                "dob": request.security_questions.date_of_birth
-            },
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "is_active": True
-        }
-        
-        await users_collection.insert_one(user_dict)
-
-        access_token, refresh_token = generate_tokens(request.email, request.roles)
-
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=ACCESS_TOKEN_EXPIRE_SECONDS,
-            roles=request.roles
-        )
+            # Retries learn the account exists but must log in for tokens.
+            await idem.store(
+                {"message": "User registered. Please log in.", "email": request.email, "roles": request.roles},
+                status_code=status.HTTP_202_ACCEPTED
+            )
+            return token
 
     except HTTPException:
         raise
@@ -69,9 +88,18 @@ async def start_registration(request: RegisterUser):
             status_code=500, 
             detail="An error occurred during registration. Please try again."
         )
-    
 
-@router.post("/login")
+
+# With email verification enabled, /register is served by routes.verification_route
+# and only creates the account once the emailed code is confirmed.
+if REGISTRATION_MODE == "direct":
+    router.add_api_route(
+        "/register", start_registration, methods=["POST"],
+        response_model=Token, status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+@router.post("/login", dependencies=[Depends(rate_limit("login", per_ip=(30, 60), per_email=(10, 300)))])
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 )-> Token:
@@ -84,7 +112,7 @@ async def login(
             headers={"WWW.Authenticate": "Bearer"}
         )
 
-    access_token, refresh_token = generate_tokens(user.email, user.roles)
+    access_token, refresh_token = await generate_tokens(user.email, user.roles)
 
     return Token(
         access_token=access_token,
@@ -100,7 +128,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
     try:
         refresh_token = request.refresh_token
         
-        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_service.decode(refresh_token)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -109,22 +137,30 @@ async def refresh_access_token(request: RefreshTokenRequest):
         if token_scope != "refresh":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token scope")
 
-        user = await users_collection.find_one({"email": email})
-
-        if not user:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-        access_token, new_refresh_token = generate_tokens(user.get("email"), user.get("roles"))
+        if payload.get("jti"):
+            session = await session_store.rotate(payload)
+            email, roles, family = session["email"], session["roles"], session["family"]
+        else:
+            # Refresh tokens issued before session tracking: check the user
+            # still exists, then move them onto a tracked session.
+            user = await users_collection.find_one({"email": email}, {"email": 1, "roles": 1, "sessions_revoked_at": 1})
+            if not user:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            if session_store.is_revoked_locally(payload) or session_store.issued_before_revocation(payload, user):
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+            email, roles, family = user.get("email"), user.get("roles"), None
+
+        access_token, new_refresh_token = await generate_tokens(email, roles, family)
 
         return Token(
             access_token=access_token, 
             refresh_token=new_refresh_token, 
             token_type="bearer", 
             expires_in=ACCESS_TOKEN_EXPIRE_SECONDS, 
-            roles=user.get("roles")
+            roles=roles
         )
 
-    except JWTError:
+    except InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
@@ -142,7 +178,10 @@ async def forgot_password(request: ForgotPasswordRequest):
     
     return {"message": "User found. Please answer security questions."}
 
-@router.post("/verify-security-questions")
+@router.post(
+    "/verify-security-questions",
+    dependencies=[Depends(rate_limit("security-questions", per_ip=(20, 60), per_email=(5, 900)))]
+)
 async def verify_security_questions(request: SecurityQuestionsVerify):
     email = request.email.lower()
     user = await users_collection.find_one({"email": email})
@@ -158,12 +197,14 @@ async def verify_security_questions(request: SecurityQuestionsVerify):
 @router.post("/reset-password")
 async def reset_password(request: ResetPasswordRequest):
     email = request.email.lower()
-    hashed_password = hash_password(request.new_password)
+    hashed_password = await hash_password_async(request.new_password)
 
     result = await users_collection.update_one(
         {"email": email},
         {"$set": {"password": hashed_password, "updated_at": datetime.utcnow()}}
     )
+    user_cache.invalidate(email=email)
+    await session_store.revoke_user(email)
 
     if result.modified_count == 0:
         raise HTTPException(status_code=400, detail="Password reset failed.")
@@ -1,68 +1,105 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from models.form_models import ApplicationForm
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, status
+from fastapi.responses import StreamingResponse
+from models.form_models import ApplicationForm, ApplicationPatch
 from models.auth_models import User
-from config.db import applications_collection, deleted_applications_collection
+from config.db import applications_collection
 from schemas.auth_schema import get_current_user
+from schemas.archive import archive_application
+from schemas.events import publish_application_event, sse_stream, user_topic
+from schemas.application_patch import apply_application_patch
+from schemas.responses import BSONResponse
+from schemas.stats import apply_stats_changes
+from schemas.idempotency import idempotent
+from schemas.fields import APPLICATION_FIELDS, APPLICATION_KEY_FIELDS, sparse_fields
+from typing import Optional
 import uuid
 from datetime import timezone, timedelta, datetime
 
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Students may only edit applications nobody has started reviewing yet.
+STUDENT_EDITABLE_STATUSES = ["Draft", "Submitted"]
+
 router = APIRouter()
 
 @router.post('/submit-application')
-async def submit_application(data: ApplicationForm, current_user: User=Depends(get_current_user)):
-    try:
-        form_dict = data.dict()
-        form_dict["applicationId"] = str(uuid.uuid4())
-        form_dict["userId"] = current_user.userId
-        form_dict["status"] = "Submitted"
-        form_dict["updatedAt"] = datetime.now(IST).isoformat()
-        form_dict["submitted_at"] = datetime.now(IST).isoformat()
+async def submit_application(
+    data: ApplicationForm,
+    current_user: User=Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
+):
+    form_dict = data.dict()
+    async with idempotent("submit-application", idempotency_key, current_user.userId, form_dict) as idem:
+        if idem.replay is not None:
+            return idem.replay
+        try:
+            form_dict["applicationId"] = str(uuid.uuid4())
+            form_dict["userId"] = current_user.userId
+            form_dict["status"] = "Submitted"
+            form_dict["version"] = 1
+            form_dict["updatedAt"] = datetime.now(IST).isoformat()
+            form_dict["submitted_at"] = datetime.now(IST).isoformat()
 
-        result = await applications_collection.insert_one(form_dict)
-        return {"message": "Application saved successfully", "id": str(result.inserted_id)}
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to save application")
+            result = await applications_collection.insert_one(form_dict)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Failed to save application")
+        idem.mark_written()
+
+        body = await idem.store({"message": "Application saved successfully", "id": str(result.inserted_id)})
+        await apply_stats_changes([(None, form_dict)])
+        return body
     
 @router.get('/student/applications')
-async def get_student_applications(current_user: User=Depends(get_current_user)):
+async def get_student_applications(
+    current_user: User=Depends(get_current_user),
+    projection: Optional[dict]=Depends(sparse_fields(APPLICATION_FIELDS, always=APPLICATION_KEY_FIELDS)),
+):
     try:
-        applications = await applications_collection.find({"userId": current_user.userId}).to_list(length=None)
-        for app in applications:
-                app["_id"] = str(app["_id"])
-
-        return applications
+        applications = await applications_collection.find({"userId": current_user.userId}, projection).to_list(length=None)
+        return BSONResponse(applications)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching applications: {str(e)}")
     
 
+@router.get('/student/applications/events')
+async def application_events(request: Request, current_user: User=Depends(get_current_user)):
+    return StreamingResponse(
+        sse_stream(request, user_topic(current_user.userId)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get('/applications/{application_id}')
 async def get_application_with_id(application_id: str, current_user: User=Depends(get_current_user)):
-     try:
-        application = await applications_collection.find_one({'applicationId': application_id})
-        application['_id'] = str(application["_id"])
-        return application
-     except:
-         raise HTTPException(
+    application = await applications_collection.find_one({'applicationId': application_id})
+    if application is None:
+        raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
+    return BSONResponse(application)
+
+@router.patch('/applications/{application_id}')
+async def patch_application(application_id: str, patch: ApplicationPatch, current_user: User=Depends(get_current_user)):
+    before, updated_app = await apply_application_patch(
+        application_id,
+        patch.changes,
+        patch.version,
+        datetime.now(IST).isoformat(),
+        extra_filter={"userId": current_user.userId},
+        editable_statuses=STUDENT_EDITABLE_STATUSES
+    )
+    await apply_stats_changes([(before, updated_app)])
+    publish_application_event("updated", updated_app)
+
+    return {"message": "Application updated successfully", "version": updated_app["version"]}
 
 @router.delete('/applications/{application_id}')
 async def delete_application(application_id: str, current_user: User = Depends(get_current_user)):
-    application = await applications_collection.find_one({'applicationId': application_id})
-    if not application:
+    result = await archive_application(application_id)
+    if result["applications"] == 0:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    application['deletedAt'] = datetime.utcnow()
-    await deleted_applications_collection.insert_one(application)
-    
-    result = await applications_collection.delete_one({'applicationId': application_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to delete application")
-    
     return {"message": "Application deleted and moved to deleted_applications collection"}
-     
\ No newline at end of file
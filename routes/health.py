@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from config.db import ping_db
+from config.lifespan import app_state
+
+router = APIRouter(prefix="/health", tags=["Monitoring"])
+
+
+@router.get("/live")
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness():
+    if not app_state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "draining" if app_state.draining else "starting"}
+        )
+    try:
+        latency = await ping_db()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "db_unreachable", "error": str(e)})
+    return {"status": "ready", "db_ping_ms": round(latency, 3)}
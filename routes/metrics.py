@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from config.metrics import render_metrics
+from schemas.password_hashing import password_hasher
+from schemas.send_emails import mail_queue
+from schemas.user_cache import user_cache
+from schemas.events import event_bus, change_watcher
+from schemas.rate_limit import rate_limiter
+from schemas.idempotency import idempotency_cache
+from schemas.token_service import token_service
+from schemas.auth_schema import session_store
+from schemas.audit import audit_log
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        render_metrics({
+            "password_hasher": password_hasher.metrics(),
+            "mail_queue": mail_queue.metrics(),
+            "user_cache": user_cache.metrics(),
+            "event_bus": event_bus.metrics(),
+            "change_stream": change_watcher.metrics(),
+            "rate_limiter": rate_limiter.metrics(),
+            "idempotency_cache": idempotency_cache.metrics(),
+            "jwt_claims_cache": token_service.metrics(),
+            "sessions": session_store.metrics(),
+            "audit_log": audit_log.metrics(),
+        }),
+        media_type="text/plain; version=0.0.4"
+    )
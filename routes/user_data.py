@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
-from typing import Annotated
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from typing import Annotated, Optional
 from models.auth_models import User
-from schemas.auth_schema import get_current_user
+from schemas.auth_schema import get_current_user, get_token_subject
+from schemas.dashboard import get_dashboard, dashboard_etag
+from schemas.responses import BSONResponse
 
 router = APIRouter()
 
@@ -9,4 +11,21 @@ router = APIRouter()
 async def get_user_profile(
     current_user: Annotated[User, Depends(get_current_user)]
 ):
-    return current_user
\ No newline at end of file
+    return current_user
+
+@router.get('/me')
+async def get_dashboard_summary(
+    email: Annotated[str, Depends(get_token_subject)],
+    if_none_match: Optional[str] = Header(None)
+):
+    dashboard = await get_dashboard(email)
+    if dashboard is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+    etag = dashboard_etag(dashboard)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    dashboard.pop("updated_at", None)
+    return BSONResponse(dashboard, headers=headers)
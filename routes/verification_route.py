@@ -1,66 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form
-from fastapi.security import OAuth2PasswordRequestForm
-from typing import Annotated
-from models.auth_models import Token, RefreshTokenRequest, RegisterUser, ALLOWED_ROLES, EmailOnlyRequest
-from schemas.auth_schema import authenticate_user, ACCESS_TOKEN_EXPIRE_SECONDS, REFRESH_TOKEN_EXPIRE_DAYS, generate_tokens, hash_password
+from fastapi import APIRouter, Depends, HTTPException, Header, status, BackgroundTasks, Form
+from typing import Optional
+from models.auth_models import Token, RegisterUser, ALLOWED_ROLES, EmailOnlyRequest
+from schemas.auth_schema import ACCESS_TOKEN_EXPIRE_SECONDS, generate_tokens, hash_password_async
 from datetime import datetime, timedelta
-from jose import JWTError
-from config.getenv_var import SECRET_KEY, ALGORITHM
-from config.db import users_collection, verification_collection
+from pymongo.errors import DuplicateKeyError
+from config.db import users_collection
+from config.getenv_var import OTP_EXPIRE_MINUTES
 from schemas.send_emails import send_verification_email
-import jwt
-import random
+from schemas.rate_limit import rate_limit
+from schemas.idempotency import idempotent, secret_digest
+from schemas.otp_store import otp_store
+import secrets
 import uuid
 
-router = APIRouter()
+router = APIRouter(tags=["Authentication"])
+
+OTP_TTL = timedelta(minutes=OTP_EXPIRE_MINUTES)
+
+
+def _new_code() -> str:
+    return str(100000 + secrets.randbelow(900000))
 
 
 @router.post("/register", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
-async def start_registration(request: RegisterUser, background_tasks: BackgroundTasks):
+async def start_registration(
+    request: RegisterUser,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None)
+):
     """
     Start user registration process by sending verification code
     """
     try:
         request.email = request.email.lower()
-        for role in request.roles:
-            if role.lower() not in ALLOWED_ROLES:
+        fingerprint = request.model_dump(exclude={"password", "security_questions"})
+        fingerprint["credentials"] = secret_digest(
+            request.password,
+            request.security_questions.first_school,
+            request.security_questions.date_of_birth
+        )
+        # A retried request must not replace (and re-mail) the code the user
+        # may already have received.
+        async with idempotent("register", idempotency_key, request.email, fingerprint) as idem:
+            if idem.replay is not None:
+                return idem.replay
+
+            for role in request.roles:
+                if role.lower() not in ALLOWED_ROLES:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid role '{role}'. Allowed roles: {list(ALLOWED_ROLES)}"
+                    )
+
+            existing_user = await users_collection.find_one({"email": request.email}, {"_id": 1})
+            if existing_user:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Invalid role '{role}'. Allowed roles: {list(ALLOWED_ROLES)}"
+                    detail=f"User already exist."
                 )
 
-        existing_user = await users_collection.find_one({"email": request.email})
-        if existing_user:
-            raise HTTPException(
-                status_code=400,
-                detail=f"User already exist."
-            )
-
-        await verification_collection.delete_one({"_id": request.email})
-
-        verification_code = str(random.randint(100000, 999999))
-
-        verification_data = {
-            "_id": request.email,
-            "name": request.name,
-            "contactnumber": request.contactnumber,
-            "password": hash_password(request.password),
-            "code": verification_code,
-            "roles": request.roles,
-            "expires_at": datetime.utcnow() + timedelta(minutes=5),
-            "created_at": datetime.utcnow()
-        }
+            verification_code = _new_code()
+
+            verification_data = {
+                "name": request.name,
+                "contactnumber": request.contactnumber,
+                "password": await hash_password_async(request.password),
+                "roles": request.roles,
+                "security_questions": {
+                    "first_school": request.security_questions.first_school,
+                    "dob": request.security_questions.date_of_birth
+                },
+            }
 
-        await verification_collection.insert_one(verification_data)
+            await otp_store.put(request.email, verification_data, verification_code, OTP_TTL)
+            idem.mark_written()
 
-        # Send verification email in background
-        background_tasks.add_task(send_verification_email, request.email, verification_code)
+            # Send verification email in background
+            background_tasks.add_task(send_verification_email, request.email, verification_code)
 
-        return {
-            "message": "Verification code sent to your email.",
-            "email": request.email,
-            "expires_in": "5 minutes"
-        }
+            return await idem.store({
+                "message": "Verification code sent to your email.",
+                "email": request.email,
+                "expires_in": f"{OTP_EXPIRE_MINUTES} minutes"
+            }, status_code=status.HTTP_202_ACCEPTED)
 
     except HTTPException:
         raise
@@ -71,43 +93,35 @@ async def start_registration(request: RegisterUser, background_tasks: Background
         )
 
 
-@router.post("/verify-code", response_model=Token)
+@router.post(
+    "/verify-code",
+    response_model=Token,
+    dependencies=[Depends(rate_limit("verify-code", per_ip=(30, 60), per_email=(5, 300)))]
+)
 async def verify_code(
     email: str = Form(..., description="User email address"),
-    code: str = Form(..., description="6-digit verification code")
+    code: str = Form(..., description="6-digit verification code"),
+    idempotency_key: Optional[str] = Header(None)
 ):
     try:
         email = email.lower()
-        verification = await verification_collection.find_one({"_id": email})
-
-        if not verification:
-            raise HTTPException(
-                status_code=400, 
-                detail="No verification request found. Please register first."
-            )
-
-        if verification["code"] != code:
-            raise HTTPException(
-                status_code=400, 
-                detail="Invalid verification code."
-            )
+        async with idempotent("verify-code", idempotency_key, email, {"code": secret_digest(code)}) as idem:
+            if idem.replay is not None:
+                return idem.replay
+
+            verification = await otp_store.consume(email, code)
+
+            if not verification:
+                # Only the failure path pays for a second lookup, to explain why.
+                pending = await otp_store.get(email)
+                if not pending:
+                    detail = "No verification request found. Please register first."
+                elif pending["code"] != code:
+                    detail = "Invalid verification code."
+                else:
+                    detail = "Verification code has expired. Please request a new one."
+                raise HTTPException(status_code=400, detail=detail)
 
-        if verification["expires_at"] < datetime.utcnow():
-            await verification_collection.delete_one({"_id": email})
-            raise HTTPException(
-                status_code=400, 
-                detail="Verification code has expired. Please request a new one."
-            )
-
-        existing_user = await users_collection.find_one({"email": email})
-        
-        if existing_user:
-            raise HTTPException(
-                status_code=400,
-                detail="User already registered with this email."
-            )
-        
-        else:
             user_data = {
                 "_id": str(uuid.uuid4()),
                 "userId": str(uuid.uuid4()),
@@ -116,34 +130,35 @@ async def verify_code(
                 "contactnumber": verification["contactnumber"],
                 "password": verification["password"],
                 "roles": verification["roles"],
+                "security_questions": verification.get("security_questions"),
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow(),
                 "is_active": True,
                 "email_verified": True
             }
-            await users_collection.insert_one(user_data)
-
-        # Clean up verification data
-        await verification_collection.delete_one({"_id": email})
-
-        user = await users_collection.find_one({"email": email})
-
-        if not user:
-            print("err")
-            raise HTTPException(status_code=500, detail="User creation failed.")
+            try:
+                await users_collection.insert_one(user_data)
+                idem.mark_written()
+            except DuplicateKeyError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="User already registered with this email."
+                )
 
-        roles = user.get("roles", [])
-        user_id = user.get("userId")
+            roles = user_data["roles"]
 
-        access_token, refresh_token = generate_tokens(user.get('email'), roles)
+            access_token, refresh_token = await generate_tokens(email, roles)
 
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=ACCESS_TOKEN_EXPIRE_SECONDS,
-            roles=roles
-        )
+            token = Token(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                token_type="bearer",
+                expires_in=ACCESS_TOKEN_EXPIRE_SECONDS,
+                roles=roles
+            )
+            # Retries learn the account exists but must log in for tokens.
+            await idem.store({"message": "Email verified. Please log in.", "email": email, "roles": roles})
+            return token
 
     except HTTPException:
         raise
@@ -153,28 +168,25 @@ async def verify_code(
             detail="An error occurred during verification. Please try again."
         )
     
-@router.post("/resend-code")
+@router.post(
+    "/resend-code",
+    dependencies=[Depends(rate_limit("resend-code", per_ip=(10, 60), per_email=(3, 600)))]
+)
 async def resend_code(request: EmailOnlyRequest, background_tasks: BackgroundTasks):
     try:
         request.email = request.email.lower()
 
-        existing = await verification_collection.find_one({"_id": request.email})
-        if not existing:
-            raise HTTPException(status_code=400, detail="No verification request found. Please register again.")
-
-        if datetime.utcnow() <= existing["expires_at"]:
+        new_code = _new_code()
+        if not await otp_store.refresh_code(request.email, new_code, OTP_TTL):
+            existing = await otp_store.get(request.email)
+            if not existing:
+                raise HTTPException(status_code=400, detail="No verification request found. Please register again.")
             raise HTTPException(status_code=400, detail="OTP is still valid. Please check your email.")
 
-        new_code = str(random.randint(100000, 999999))
-        await verification_collection.update_one(
-            {"_id": request.email},
-            {"$set": {"code": new_code, "expires_at": datetime.utcnow() + timedelta(minutes=5)}}
-        )
-
         background_tasks.add_task(send_verification_email, request.email, new_code)
         return {"message": "A new verification code has been sent."}
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
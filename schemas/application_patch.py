@@ -0,0 +1,130 @@
+import types
+from typing import Any, Union, get_args, get_origin
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pymongo import ReturnDocument
+from config.db import applications_collection
+from models.form_models import ApplicationForm
+from schemas.stats import STATS_PROJECTION, apply_dotted
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def flatten_patch(patch: dict, current: dict | None, model: type[BaseModel] = ApplicationForm,
+                  prefix: str = "") -> tuple[dict, list]:
+    """
+    Turns a sparse, nested patch of `model` into dotted $set paths and a list of
+    $unset paths (fields explicitly set to null). `current` is the stored
+    document at the same level: nested models are descended into only where it
+    already holds a subdocument, since Mongo cannot $set below a null or
+    missing parent. Otherwise (and for scalars and lists) the value is
+    validated against the full field type and replaced as a whole, so a newly
+    created section always has its required fields.
+    """
+    to_set, to_unset = {}, []
+    for key, value in patch.items():
+        path = f"{prefix}{key}"
+        field = model.model_fields.get(key)
+        if field is None:
+            raise HTTPException(status_code=422, detail=f"Unknown field '{path}'.")
+
+        annotation = _unwrap_optional(field.annotation)
+        if value is None:
+            if field.is_required():
+                raise HTTPException(status_code=422, detail=f"Field '{path}' cannot be removed.")
+            to_unset.append(path)
+        elif _is_model(annotation) and isinstance(value, dict) and isinstance((current or {}).get(key), dict):
+            nested_set, nested_unset = flatten_patch(value, current[key], annotation, f"{path}.")
+            to_set.update(nested_set)
+            to_unset.extend(nested_unset)
+        else:
+            try:
+                validated = TypeAdapter(field.annotation).validate_python(value)
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid value for '{path}': {e.errors()[0]['msg']}")
+            to_set[path] = _dump(validated)
+    return to_set, to_unset
+
+
+def _dump(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+def _version_filter(version: int) -> dict:
+    # Applications written before versioning have no field; treat them as 0.
+    if version == 0:
+        return {"$or": [{"version": 0}, {"version": {"$exists": False}}]}
+    return {"version": version}
+
+
+async def apply_application_patch(application_id: str, patch: dict, version: int, updated_at: str,
+                                  extra_filter: dict | None = None,
+                                  editable_statuses: list[str] | None = None) -> tuple[dict, dict]:
+    """
+    Applies the patch and returns (before, after) views of the application
+    holding its identifiers, version and dashboard stats fields.
+
+    The patched sections are read first to decide how deep the update can
+    go; the write is still conditional on `version`, so a concurrent change
+    to those sections turns into a 409 rather than a lost update.
+    """
+    unknown = [key for key in patch if key not in ApplicationForm.model_fields]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown field '{unknown[0]}'.")
+
+    owner_filter = {"applicationId": application_id, **(extra_filter or {})}
+    current = await applications_collection.find_one(
+        owner_filter,
+        {"_id": 0, "version": 1, "status": 1, **{key: 1 for key in patch}}
+    )
+    if current is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    if editable_statuses is not None and current.get("status") not in editable_statuses:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Application can no longer be edited (status '{current.get('status')}')."
+        )
+
+    to_set, to_unset = flatten_patch(patch, current)
+    if not to_set and not to_unset:
+        raise HTTPException(status_code=400, detail="No changes provided.")
+
+    update = {"$set": {**to_set, "updated_at": updated_at}, "$inc": {"version": 1}}
+    if to_unset:
+        update["$unset"] = {path: "" for path in to_unset}
+
+    query = {**owner_filter, **_version_filter(version)}
+    if editable_statuses is not None:
+        query["status"] = {"$in": editable_statuses}
+    before = await applications_collection.find_one_and_update(
+        query,
+        update,
+        projection={"_id": 0, "applicationId": 1, "userId": 1, "version": 1, "updated_at": 1, **STATS_PROJECTION},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is not None:
+        after = apply_dotted(before, update["$set"], to_unset)
+        after["version"] = before.get("version", 0) + 1
+        return before, after
+
+    current = await applications_collection.find_one(owner_filter, {"_id": 0, "version": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    raise HTTPException(
+        status_code=409,
+        detail=f"Application was modified concurrently (current version {current.get('version', 0)})."
+    )
@@ -0,0 +1,103 @@
+import time
+from datetime import datetime
+from pymongo.errors import OperationFailure, ConfigurationError
+from config.db import (
+    db_client, users_collection, applications_collection,
+    deleted_users_collection, deleted_applications_collection
+)
+from schemas.stats import STATS_PROJECTION, apply_stats_changes
+
+# Transactions need a replica set or mongos; on a standalone server the first
+# attempt fails and every later call goes straight to the $merge pipelines.
+_transactions_supported = True
+
+
+async def _archive_in_transaction(user_query: dict | None, application_query: dict, deleted_at: datetime) -> dict:
+    async with await db_client.start_session() as session:
+        async with session.start_transaction():
+            users = []
+            if user_query is not None:
+                users = await users_collection.find(user_query, session=session).to_list(length=None)
+            applications = await applications_collection.find(application_query, session=session).to_list(length=None)
+            for doc in users + applications:
+                doc["deletedAt"] = deleted_at
+            if users:
+                await deleted_users_collection.insert_many(users, ordered=False, session=session)
+                await users_collection.delete_many(user_query, session=session)
+            if applications:
+                await deleted_applications_collection.insert_many(applications, ordered=False, session=session)
+                await applications_collection.delete_many(application_query, session=session)
+    return {
+        "users": [doc.get("userId") for doc in users],
+        "emails": [doc.get("email") for doc in users],
+        "applications": applications,
+    }
+
+
+async def _merge_into(source, ids: list, target, deleted_at: datetime):
+    await source.aggregate([
+        {"$match": {"_id": {"$in": ids}}},
+        {"$addFields": {"deletedAt": deleted_at}},
+        {"$merge": {"into": target.name, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]).to_list(length=None)
+    await source.delete_many({"_id": {"$in": ids}})
+
+
+async def _archive_with_merge(user_query: dict | None, application_query: dict, deleted_at: datetime) -> dict:
+    """
+    Standalone-server fallback: each collection is copied server-side with
+    $merge and then deleted by _id, so documents written mid-archive are
+    never removed unarchived. Not atomic across collections.
+    """
+    users = []
+    if user_query is not None:
+        users = await users_collection.find(user_query, {"userId": 1, "email": 1}).to_list(length=None)
+    applications = await applications_collection.find(application_query, STATS_PROJECTION).to_list(length=None)
+    if applications:
+        application_ids = [doc["_id"] for doc in applications]
+        await _merge_into(applications_collection, application_ids, deleted_applications_collection, deleted_at)
+    if users:
+        await _merge_into(users_collection, [doc["_id"] for doc in users], deleted_users_collection, deleted_at)
+    return {
+        "users": [doc.get("userId") for doc in users],
+        "emails": [doc.get("email") for doc in users],
+        "applications": applications,
+    }
+
+
+async def _archive(user_query: dict | None, application_query: dict) -> dict:
+    global _transactions_supported
+    started = time.perf_counter()
+    deleted_at = datetime.utcnow()
+    result = None
+    if _transactions_supported:
+        try:
+            result = await _archive_in_transaction(user_query, application_query, deleted_at)
+            result["mode"] = "transaction"
+        except (OperationFailure, ConfigurationError) as e:
+            if isinstance(e, OperationFailure) and e.code != 20:
+                raise
+            _transactions_supported = False
+    if result is None:
+        result = await _archive_with_merge(user_query, application_query, deleted_at)
+        result["mode"] = "merge"
+    await apply_stats_changes([(doc, None) for doc in result["applications"]])
+    result["applications"] = len(result["applications"])
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+async def archive_users(user_ids: list[str]) -> dict:
+    """
+    Moves the given users and all of their applications into the deleted_*
+    collections. Returns the userIds actually archived, the number of
+    applications moved, the mode used and the elapsed time.
+    """
+    return await _archive({"userId": {"$in": user_ids}}, {"userId": {"$in": user_ids}})
+
+
+async def archive_application(application_id: str) -> dict:
+    result = await _archive(None, {"applicationId": application_id})
+    result.pop("users")
+    result.pop("emails")
+    return result
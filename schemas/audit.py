@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from datetime import datetime
+from config.db import audit_log_collection
+from config.getenv_var import (
+    AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS, AUDIT_QUEUE_SIZE, AUDIT_ENQUEUE_TIMEOUT_SECONDS
+)
+
+logger = logging.getLogger("ahatin.audit")
+
+
+class AuditLog:
+    """
+    Write-behind audit trail. Admin routes enqueue events and return; one
+    background writer flushes them with insert_many once `batch_size` events
+    are waiting or `flush_interval` seconds have passed since the first one.
+    The queue is bounded: when the writer falls behind, callers wait up to
+    `enqueue_timeout` for space and the event is dropped (and counted) after
+    that, so a slow database never stalls admin requests indefinitely.
+    """
+
+    def __init__(self, collection, batch_size: int = 100, flush_interval: float = 1.0,
+                 maxsize: int = 10000, enqueue_timeout: float = 0.05):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.flushes = 0
+
+    def start(self):
+        if self._writer is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._writer = asyncio.create_task(self._run())
+
+    async def record(self, action: str, entity: str, entity_id: str, actor: str | None = None,
+                     changes: dict | None = None, **details):
+        self.start()
+        event = {
+            "at": datetime.utcnow(),
+            "actor": actor,
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+        }
+        if changes is not None:
+            event["changes"] = changes
+        if details:
+            event["details"] = details
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                logger.warning("Audit queue full, dropped %s %s/%s", action, entity, entity_id)
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: list):
+        self.flushes += 1
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error("Audit flush of %d events failed: %s", len(batch), e)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def metrics(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+        }
+
+    async def stop(self, timeout: float | None = 10):
+        if self._writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Audit log stopped with %d unflushed events", self._queue.qsize())
+        self._writer.cancel()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+
+
+audit_log = AuditLog(
+    audit_log_collection,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL_SECONDS,
+    maxsize=AUDIT_QUEUE_SIZE,
+    enqueue_timeout=AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
@@ -3,20 +3,22 @@ from typing import Annotated, List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from passlib.context import CryptContext
 from models.auth_models import UserInDB, TokenData
 from config.db import users_collection
-from config.getenv_var import SECRET_KEY, ALGORITHM
-import jwt
+from schemas.password_hashing import pwd_context, password_hasher
+from schemas.user_cache import user_cache
+from schemas.token_service import token_service
+from schemas.sessions import SessionStore
+import time
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 ACCESS_TOKEN_EXPIRE_SECONDS = 3600
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+session_store = SessionStore(refresh_ttl_seconds=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -24,34 +26,55 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     to_encode.update({
         "exp": datetime.utcnow() + expires_delta,
         "scope": "access"
     })
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return token_service.encode(to_encode)
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta):
     payload = data.copy()
     payload.update({
+        "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + expires_delta,
         "scope": "refresh"
     })
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return token_service.encode(payload)
 
-def generate_tokens(email: str, roles: list):
+async def generate_tokens(email: str, roles: list, family: str | None = None):
     access_token = create_access_token(
         data={"sub": email, "roles": roles},
         expires_delta=timedelta(seconds=ACCESS_TOKEN_EXPIRE_SECONDS)
     )
+    session = await session_store.create(email, roles, family)
     refresh_token = create_refresh_token(
-        data={"sub": email, "roles": roles},
+        data={"sub": email, "roles": roles, "jti": session["_id"], "fam": session["family"]},
         expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     )
     return access_token, refresh_token
 
+async def warm_up_auth():
+    """
+    Pays first-use costs before traffic arrives: loads the bcrypt backend and
+    starts the hashing workers, and runs one JWT encode/decode.
+    """
+    hashed = await hash_password_async("warm-up")
+    await verify_password_async("warm-up", hashed)
+    access_token = create_access_token(
+        data={"sub": "warm-up@localhost", "roles": []},
+        expires_delta=timedelta(seconds=60)
+    )
+    token_service.decode(access_token)
+
 async def get_user(email: str):
     user_dict = await users_collection.find_one({"email": email})
     if user_dict:
@@ -69,20 +92,19 @@ async def authenticate_user(email: str, password: str):
     user = await get_user(email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
-
+def decode_access_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = token_service.decode(token)
         if payload.get("scope") != "access":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -92,16 +114,38 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        payload["sub"] = TokenData(email=email).email
 
     except InvalidTokenError:
         raise credentials_exception
-    
-    user = await get_user(email=token_data.email)
+
+    return payload
+
+
+async def get_token_subject(token: Annotated[str, Depends(oauth2_scheme)]) -> str:
+    """Validates the access token without loading the user; returns its email."""
+    return decode_access_token(token)["sub"]
+
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
+    payload = decode_access_token(token)
+    email = payload["sub"]
+
+    cache_key = (email, token)
+    user = user_cache.get(cache_key)
+    if user is not None:
+        return user
+
+    user = await get_user(email=email)
 
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
+    user_cache.set(cache_key, user, ttl_seconds=payload.get("exp", 0) - time.time())
     return user
 
 def requires_roles(allowed_roles: List[str]):
@@ -0,0 +1,47 @@
+import hashlib
+from config.db import users_collection, applications_collection
+
+APPLICATION_SUMMARY_FIELDS = ("applicationId", "status", "version", "submitted_at", "updatedAt", "updated_at")
+
+
+def _dashboard_pipeline(email: str) -> list:
+    return [
+        {"$match": {"email": email}},
+        {"$limit": 1},
+        {"$project": {
+            "_id": 0,
+            "userId": 1,
+            "name": 1,
+            "email": 1,
+            "contactnumber": 1,
+            "roles": 1,
+            "updated_at": 1,
+        }},
+        {"$lookup": {
+            "from": applications_collection.name,
+            "localField": "userId",
+            "foreignField": "userId",
+            "as": "applications",
+            "pipeline": [
+                {"$sort": {"submitted_at": -1}},
+                {"$project": {"_id": 0, **{field: 1 for field in APPLICATION_SUMMARY_FIELDS}}},
+            ],
+        }},
+    ]
+
+
+async def get_dashboard(email: str) -> dict | None:
+    """Profile plus application summaries in one aggregation round-trip."""
+    result = await users_collection.aggregate(_dashboard_pipeline(email)).to_list(length=1)
+    return result[0] if result else None
+
+
+def dashboard_etag(dashboard: dict) -> str:
+    """
+    Weak ETag over the profile fields and each application's identity, status,
+    version and timestamps; cheap compared to serializing the response.
+    """
+    parts = [repr(dashboard.get(field)) for field in ("userId", "name", "email", "contactnumber", "roles", "updated_at")]
+    for application in dashboard.get("applications", []):
+        parts.append(repr(tuple(application.get(field) for field in APPLICATION_SUMMARY_FIELDS)))
+    return f'W/"{hashlib.sha1("|".join(parts).encode()).hexdigest()}"'
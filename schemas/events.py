@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator
+from fastapi import Request
+from pymongo.errors import OperationFailure
+from config.db import applications_collection
+from config.getenv_var import APPLICATION_CHANGE_STREAMS, SSE_HEARTBEAT_SECONDS, SSE_MAX_STREAM_SECONDS
+
+ADMIN_TOPIC = "admin"
+
+logger = logging.getLogger("ahatin.events")
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class EventBus:
+    """
+    In-process pub/sub. Each subscriber gets a bounded queue; a subscriber that
+    falls behind loses its oldest events rather than slowing publishers down.
+    Events only reach clients connected to the same worker process.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(topic)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[topic]
+
+    def publish(self, topic: str, event: dict):
+        self.published += 1
+        for queue in self._subscribers.get(topic, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def metrics(self) -> dict:
+        return {
+            "topics": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+event_bus = EventBus()
+
+
+def _application_event(event_type: str, application: dict) -> dict:
+    return {
+        "type": event_type,
+        "applicationId": application.get("applicationId"),
+        "userId": application.get("userId"),
+        "status": application.get("status"),
+        "updated_at": application.get("updated_at") or datetime.utcnow().isoformat(),
+    }
+
+
+def _publish(event: dict):
+    event_bus.publish(ADMIN_TOPIC, event)
+    if event.get("userId"):
+        event_bus.publish(user_topic(event["userId"]), event)
+
+
+class ChangeStreamWatcher:
+    """
+    Publishes every application update seen on the Mongo change stream, which
+    lets events from other workers reach this one (requires a replica set).
+    Failures are logged and the stream is reopened with exponential backoff,
+    resuming after the last change seen; `live` is False while it is down.
+    """
+
+    def __init__(self, max_backoff: float = 60.0):
+        self.max_backoff = max_backoff
+        self.live = False
+        self.resume_token = None
+        self.restarts = 0
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["update", "replace"]}}}]
+        options = {"resume_after": self.resume_token} if self.resume_token is not None else {}
+        async with applications_collection.watch(pipeline, full_document="updateLookup", **options) as stream:
+            self.live = True
+            async for change in stream:
+                self.resume_token = stream.resume_token
+                document = change.get("fullDocument")
+                if not document:
+                    continue
+                updated = change.get("updateDescription", {}).get("updatedFields", {})
+                event_type = "status" if "status" in updated else "updated"
+                _publish(_application_event(event_type, document))
+
+    async def run(self):
+        backoff = 1.0
+        while True:
+            error = None
+            try:
+                await self._watch()
+            except Exception as e:
+                error = e
+            finally:
+                was_live, self.live = self.live, False
+
+            if was_live:
+                backoff = 1.0
+            if isinstance(error, OperationFailure) and self.resume_token is not None:
+                # Most likely the token fell off the oplog; start from now.
+                self.resume_token = None
+            self.restarts += 1
+            logger.warning("Application change stream stopped (%s); reopening in %.0fs", error, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def metrics(self) -> dict:
+        return {"live": int(self.live), "restarts": self.restarts}
+
+
+change_watcher = ChangeStreamWatcher()
+
+
+def publish_application_event(event_type: str, application: dict):
+    """
+    Called by routes after they change an application. While the change
+    stream watcher is live it publishes instead, so this is a no-op; when it
+    is down, events are published locally so clients still get them.
+    """
+    if APPLICATION_CHANGE_STREAMS and change_watcher.live:
+        return
+    _publish(_application_event(event_type, application))
+
+
+async def watch_application_changes():
+    await change_watcher.run()
+
+
+async def sse_stream(request: Request, topic: str) -> AsyncIterator[str]:
+    """
+    Streams `topic` until the client disconnects or SSE_MAX_STREAM_SECONDS
+    pass; the client then reconnects after the advertised retry delay.
+    """
+    queue = event_bus.subscribe(topic)
+    deadline = asyncio.get_running_loop().time() + SSE_MAX_STREAM_SECONDS
+    try:
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: application\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        event_bus.unsubscribe(topic, queue)
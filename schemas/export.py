@@ -0,0 +1,104 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator
+import orjson
+from config.db import users_collection, applications_collection
+from schemas.responses import bson_default
+
+EXPORT_BATCH_SIZE = 500
+
+STUDENT_COLUMNS = ["userId", "name", "email", "contactnumber", "created_at"]
+
+APPLICATION_COLUMNS = [
+    "applicationId",
+    "status",
+    "submitted_at",
+    "updatedAt",
+    "educational.highestQualification.type",
+    "educational.highestQualification.school",
+    "educational.highestQualification.board",
+    "educational.highestQualification.year",
+    "educational.highestQualification.percentage",
+    "educational.previousQualifications",
+    "studyPreferences.preferredCountry",
+    "studyPreferences.preferredCourse",
+    "studyPreferences.preferredIntakeMonth",
+    "studyPreferences.preferredIntakeYear",
+    "studyPreferences.degreeLevel",
+    "studyPreferences.preferredUniversities",
+    "certifications.hasCertifications",
+    "certifications.scores.ielts",
+    "certifications.scores.toefl",
+    "certifications.scores.pte",
+    "workExperience.hasExperience",
+    "workExperience.experience.jobTitle",
+    "workExperience.experience.isRelated",
+    "workExperience.experience.companyName",
+    "workExperience.experience.years",
+    "financialInformation.estimatedBudget",
+    "financialInformation.sourceOfFunding",
+]
+
+
+def _export_pipeline() -> list:
+    return [
+        {"$match": {"roles": "student"}},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$project": {"_id": 0, **{field: 1 for field in STUDENT_COLUMNS}}},
+        {"$lookup": {
+            "from": applications_collection.name,
+            "localField": "userId",
+            "foreignField": "userId",
+            "as": "applications",
+            "pipeline": [{"$project": {"_id": 0, "userId": 0}}],
+        }},
+    ]
+
+
+def _students_cursor():
+    return users_collection.aggregate(_export_pipeline(), batchSize=EXPORT_BATCH_SIZE)
+
+
+def _dumps(value) -> bytes:
+    # Same encoding as BSONResponse, so exports match the API (ISO-8601 datetimes).
+    return orjson.dumps(value, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _lookup(doc: dict, dotted: str):
+    value = doc
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    if isinstance(value, (list, dict)):
+        return _dumps(value).decode()
+    if isinstance(value, datetime):
+        return _dumps(value).decode().strip('"')
+    return value
+
+
+async def export_ndjson() -> AsyncIterator[bytes]:
+    async for student in _students_cursor():
+        yield _dumps(student) + b"\n"
+
+
+async def export_csv() -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
+
+    writer.writerow(STUDENT_COLUMNS + APPLICATION_COLUMNS)
+    yield flush()
+
+    async for student in _students_cursor():
+        student_row = [_lookup(student, column) for column in STUDENT_COLUMNS]
+        applications = student.get("applications") or [{}]
+        for application in applications:
+            writer.writerow(student_row + [_lookup(application, column) for column in APPLICATION_COLUMNS])
+        yield flush()
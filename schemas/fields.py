@@ -0,0 +1,61 @@
+from typing import Optional
+from fastapi import HTTPException, Query
+from models.form_models import ApplicationOut
+
+
+APPLICATION_FIELDS = {name for name in ApplicationOut.model_fields if name != "id"}
+APPLICATION_KEY_FIELDS = ("applicationId", "userId", "status")
+
+
+def sparse_fields(allowed: set[str], always: tuple[str, ...] = (), alias: str = "fields"):
+    """
+    Dependency turning a `fields=educational,studyPreferences.country` query
+    parameter into a Mongo inclusion projection, so unrequested sections never
+    leave the database. Paths must be one of `allowed` or lie under one;
+    `always` fields are kept so clients can still identify (and page through)
+    the results. `alias` renames the query parameter for endpoints returning
+    more than one kind of document. Resolves to None when it is absent.
+    """
+    def dependency(
+        fields: Optional[str] = Query(None, alias=alias, description="Comma-separated list of fields to return")
+    ) -> dict | None:
+        if not fields:
+            return None
+
+        requested = set(always)
+        for field in fields.split(","):
+            field = field.strip()
+            if not field:
+                continue
+            if not any(field == path or field.startswith(f"{path}.") for path in allowed):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown field '{field}'. Allowed: {sorted(allowed)}"
+                )
+            requested.add(field)
+
+        # Mongo rejects a projection containing both "a" and "a.b".
+        projection = {}
+        for field in sorted(requested, key=len):
+            if not any(field.startswith(f"{kept}.") for kept in projection):
+                projection[field] = 1
+        return projection
+
+    return dependency
+
+
+def apply_projection(doc: dict, projection: dict) -> dict:
+    """Applies an inclusion projection in Python, for documents not read from Mongo."""
+    result = {}
+    for path in projection:
+        source, target = doc, result
+        parts = path.split(".")
+        for part in parts[:-1]:
+            source = source.get(part) if isinstance(source, dict) else None
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(part, {})
+        else:
+            if parts[-1] in source:
+                target[parts[-1]] = source[parts[-1]]
+    return result
@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from config.db import idempotency_collection
+from config.getenv_var import IDEMPOTENCY_TTL_SECONDS, SECRET_KEY
+from schemas.cache import TTLCache
+
+MAX_KEY_LENGTH = 255
+
+# Completed responses only; pending reservations always go to Mongo.
+idempotency_cache = TTLCache(max_entries=10000, ttl_seconds=min(IDEMPOTENCY_TTL_SECONDS, 600))
+
+
+def _fingerprint(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def secret_digest(*values: str) -> str:
+    """
+    Keyed digest of credentials for use in a request fingerprint, so a replay
+    requires the original secrets without them ever being stored.
+    """
+    message = "\x1f".join(values).encode()
+    return hmac.new((SECRET_KEY or "").encode(), message, hashlib.sha256).hexdigest()
+
+
+class IdempotentRequest:
+    def __init__(self, record_id: str | None, fingerprint: str | None):
+        self.record_id = record_id
+        self.fingerprint = fingerprint
+        self.replay: JSONResponse | None = None
+        self.completed = False
+        self.written = False
+
+    def mark_written(self):
+        """
+        Records that the guarded side effect has happened. From then on the
+        reservation is kept even if storing the response fails, so a retry
+        gets a 409 (until the TTL expires it) instead of repeating the write.
+        """
+        self.written = True
+
+    async def store(self, body: dict, status_code: int = 200) -> dict:
+        """
+        Saves the response for future retries and returns `body` unchanged.
+        Never store credentials or tokens here: the record is kept in
+        plaintext for IDEMPOTENCY_TTL_SECONDS.
+        """
+        if self.record_id is not None:
+            await idempotency_collection.update_one(
+                {"_id": self.record_id},
+                {"$set": {"state": "completed", "status_code": status_code, "body": body}}
+            )
+            idempotency_cache.set(self.record_id, (self.fingerprint, status_code, body))
+            self.completed = True
+        return body
+
+
+def _replay(record_id: str, fingerprint: str, stored_fingerprint: str, status_code: int, body: dict) -> JSONResponse:
+    if stored_fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request."
+        )
+    return JSONResponse(content=body, status_code=status_code, headers={"Idempotent-Replayed": "true"})
+
+
+@asynccontextmanager
+async def idempotent(scope: str, key: str | None, owner: str, payload):
+    """
+    Guards a non-idempotent operation with the client's Idempotency-Key.
+
+    The first request for (scope, owner, key) reserves the key with a single
+    upsert; retries get the stored response back from the hot cache or that
+    same upsert, so the operation runs once. If the operation raises, the
+    reservation is released and the client may retry, unless the operation
+    already called `mark_written()`.
+    """
+    if not key:
+        yield IdempotentRequest(None, None)
+        return
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long.")
+
+    record_id = f"{scope}:{owner}:{key}"
+    fingerprint = _fingerprint(payload)
+    request = IdempotentRequest(record_id, fingerprint)
+
+    cached = idempotency_cache.get(record_id)
+    if cached is not None:
+        request.replay = _replay(record_id, fingerprint, *cached)
+        yield request
+        return
+
+    existing = await idempotency_collection.find_one_and_update(
+        {"_id": record_id},
+        {"$setOnInsert": {"state": "pending", "fingerprint": fingerprint, "created_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    if existing is not None:
+        if existing.get("state") != "completed":
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress.")
+        idempotency_cache.set(record_id, (existing["fingerprint"], existing["status_code"], existing["body"]))
+        request.replay = _replay(record_id, fingerprint, existing["fingerprint"], existing["status_code"], existing["body"])
+        yield request
+        return
+
+    try:
+        yield request
+    finally:
+        if not request.completed and not request.written:
+            await idempotency_collection.delete_one({"_id": record_id, "state": "pending"})
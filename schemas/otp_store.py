@@ -0,0 +1,81 @@
+import copy
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from config.db import verification_collection
+from config.getenv_var import OTP_STORE, VERIFICATION_RETENTION_SECONDS
+
+
+class MongoOTPStore:
+    """
+    Pending registrations keyed by email in verification_collection. Code
+    validity is checked inside each query; the TTL index on `expires_at`
+    purges stale entries once the resend grace period has passed.
+    """
+
+    async def put(self, email: str, data: dict, code: str, ttl: timedelta):
+        now = datetime.utcnow()
+        await verification_collection.replace_one(
+            {"_id": email},
+            {**data, "code": code, "expires_at": now + ttl, "created_at": now},
+            upsert=True
+        )
+
+    async def get(self, email: str) -> dict | None:
+        return await verification_collection.find_one({"_id": email})
+
+    async def refresh_code(self, email: str, code: str, ttl: timedelta) -> bool:
+        """Replaces the code only if the previous one has expired."""
+        now = datetime.utcnow()
+        result = await verification_collection.find_one_and_update(
+            {"_id": email, "expires_at": {"$lte": now}},
+            {"$set": {"code": code, "expires_at": now + ttl}},
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return result is not None
+
+    async def consume(self, email: str, code: str) -> dict | None:
+        """Atomically takes the pending registration if `code` is valid and unexpired."""
+        return await verification_collection.find_one_and_delete(
+            {"_id": email, "code": code, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+
+
+class InMemoryOTPStore:
+    """Single-process store for tests and single-node deployments."""
+
+    def __init__(self, retention_seconds: int):
+        self.retention = timedelta(seconds=retention_seconds)
+        self._entries: dict[str, dict] = {}
+
+    def _purge(self, now: datetime):
+        expired = [email for email, entry in self._entries.items() if entry["expires_at"] + self.retention <= now]
+        for email in expired:
+            del self._entries[email]
+
+    async def put(self, email: str, data: dict, code: str, ttl: timedelta):
+        now = datetime.utcnow()
+        self._purge(now)
+        self._entries[email] = {**data, "_id": email, "code": code, "expires_at": now + ttl, "created_at": now}
+
+    async def get(self, email: str) -> dict | None:
+        self._purge(datetime.utcnow())
+        entry = self._entries.get(email)
+        return copy.deepcopy(entry) if entry else None
+
+    async def refresh_code(self, email: str, code: str, ttl: timedelta) -> bool:
+        now = datetime.utcnow()
+        entry = self._entries.get(email)
+        if entry is None or entry["expires_at"] > now:
+            return False
+        entry.update(code=code, expires_at=now + ttl)
+        return True
+
+    async def consume(self, email: str, code: str) -> dict | None:
+        entry = self._entries.get(email)
+        if entry is None or entry["code"] != code or entry["expires_at"] <= datetime.utcnow():
+            return None
+        return self._entries.pop(email)
+
+
+otp_store = InMemoryOTPStore(VERIFICATION_RETENTION_SECONDS) if OTP_STORE == "memory" else MongoOTPStore()
@@ -0,0 +1,44 @@
+import base64
+import json
+import re
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+def encode_cursor(sort_value: datetime, doc_id) -> str:
+    payload = {
+        "t": sort_value.isoformat() if sort_value else None,
+        "id": str(doc_id),
+        "oid": isinstance(doc_id, ObjectId),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, object]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_value = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        doc_id = ObjectId(payload["id"]) if payload["oid"] else payload["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return sort_value, doc_id
+
+
+def keyset_after(field: str, cursor: str) -> dict:
+    """
+    Filter selecting documents that come after `cursor` when sorted by
+    (`field` desc, _id desc).
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    return {"$or": [
+        {field: {"$lt": sort_value}},
+        {field: sort_value, "_id": {"$lt": doc_id}},
+    ]}
+
+
+def prefix_regex(prefix: str, case_insensitive: bool = False) -> dict:
+    query = {"$regex": f"^{re.escape(prefix)}"}
+    if case_insensitive:
+        query["$options"] = "i"
+    return query
@@ -0,0 +1,143 @@
+import math
+import time
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Request, status
+from pymongo import ReturnDocument
+from config.db import rate_limits_collection
+from config.getenv_var import RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, TRUST_PROXY_HEADERS
+
+
+def _sliding_estimate(previous: int, current: int, window: float, now: float) -> float:
+    # Sliding-window counter: the previous fixed window's count is weighted by
+    # how much of it still overlaps the trailing `window` seconds.
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+class InMemoryRateLimitBackend:
+    """
+    Per-process sliding-window counters. O(1) per hit; stale keys are swept
+    every `sweep_every` hits. Limits are per worker, so with N workers the
+    effective limit is up to N times higher; use the mongo backend to share.
+    """
+
+    def __init__(self, sweep_every: int = 10000):
+        # key -> [window index, previous count, current count, window seconds]
+        self._windows: dict[str, list] = {}
+        self._hits = 0
+        self.sweep_every = sweep_every
+
+    async def hit(self, key: str, window: int, now: float) -> tuple[int, int]:
+        index = int(now // window)
+        entry = self._windows.get(key)
+        if entry is None or entry[0] < index - 1:
+            entry = self._windows[key] = [index, 0, 0, window]
+        elif entry[0] == index - 1:
+            entry[:] = [index, entry[2], 0, window]
+        entry[2] += 1
+
+        self._hits += 1
+        if self._hits % self.sweep_every == 0:
+            self._sweep(now)
+        return entry[1], entry[2]
+
+    def _sweep(self, now: float):
+        stale = [key for key, entry in self._windows.items() if entry[0] < int(now // entry[3]) - 1]
+        for key in stale:
+            del self._windows[key]
+
+
+class MongoRateLimitBackend:
+    """
+    Shared counters for multi-worker deployments: one document per key and
+    fixed window, expired by a TTL index on `expires_at`.
+    """
+
+    async def hit(self, key: str, window: int, now: float) -> tuple[int, int]:
+        index = int(now // window)
+        current = await rate_limits_collection.find_one_and_update(
+            {"_id": f"{key}:{index}"},
+            {
+                "$inc": {"count": 1},
+                "$setOnInsert": {"expires_at": datetime.utcnow() + timedelta(seconds=2 * window)},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous = await rate_limits_collection.find_one({"_id": f"{key}:{index - 1}"}, {"count": 1})
+        return (previous or {}).get("count", 0), current["count"]
+
+
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+        self.allowed = 0
+        self.rejected = 0
+
+    async def check(self, key: str, limit: int, window: int) -> int:
+        """Records one attempt for `key`; returns 0 if allowed, else seconds to wait."""
+        now = time.time()
+        previous, current = await self.backend.hit(key, window, now)
+        if _sliding_estimate(previous, current, window, now) > limit:
+            self.rejected += 1
+            return max(1, math.ceil(window - now % window))
+        self.allowed += 1
+        return 0
+
+    def metrics(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+rate_limiter = RateLimiter(
+    MongoRateLimitBackend() if RATE_LIMIT_BACKEND == "mongo" else InMemoryRateLimitBackend()
+)
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _email_from_request(request: Request) -> str | None:
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+        elif content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            body = await request.form()
+        else:
+            return None
+    except Exception:
+        return None
+    email = (body.get("email") or body.get("username")) if hasattr(body, "get") else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def rate_limit(name: str, per_ip: tuple[int, int], per_email: tuple[int, int] | None = None):
+    """
+    Dependency limiting `name` to per_ip=(attempts, seconds) per client IP and,
+    optionally, per_email=(attempts, seconds) per submitted email. Runs before
+    the endpoint body, so rejected requests never reach bcrypt or the database.
+    """
+    async def limiter(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        checks = [(f"{name}:ip:{client_ip(request)}", *per_ip)]
+        if per_email is not None:
+            email = await _email_from_request(request)
+            if email:
+                checks.append((f"{name}:email:{email}", *per_email))
+
+        for key, limit, window in checks:
+            retry_after = await rate_limiter.check(key, limit, window)
+            if retry_after:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many attempts. Please try again later.",
+                    headers={"Retry-After": str(retry_after)}
+                )
+
+    return limiter
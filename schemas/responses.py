@@ -0,0 +1,32 @@
+from typing import Any
+import orjson
+from bson import ObjectId, Decimal128
+from fastapi.encoders import ENCODERS_BY_TYPE
+from fastapi.responses import JSONResponse
+
+
+def bson_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class BSONResponse(JSONResponse):
+    """
+    orjson-backed JSON response that also understands ObjectId and
+    Decimal128, so raw Mongo documents can be returned without a fix-up pass.
+    datetimes are serialized natively by orjson.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def register_bson_encoders():
+    """Teach jsonable_encoder about BSON types for routes that still use it."""
+    ENCODERS_BY_TYPE[ObjectId] = str
+    ENCODERS_BY_TYPE[Decimal128] = lambda value: str(value.to_decimal())
@@ -0,0 +1,196 @@
+import asyncio
+import time
+from collections import defaultdict
+from config.db import users_collection, applications_collection
+from config.indexes import SEARCH_COLLATION
+from config.getenv_var import SEARCH_BACKEND, TRIGRAM_REFRESH_SECONDS
+from schemas.fields import apply_projection
+
+STUDENT_FIELDS = ("name", "email", "contactnumber")
+# Prefix matches on earlier fields rank higher.
+STUDENT_PREFIX_ORDER = ("email", "name", "contactnumber")
+STUDENT_PROJECTION = {"_id": 0, "userId": 1, "name": 1, "email": 1, "contactnumber": 1, "created_at": 1}
+
+APPLICATION_TEXT_FIELDS = (
+    "educational.highestQualification.school",
+    "studyPreferences.preferredCourse",
+    "studyPreferences.preferredUniversities",
+    "studyPreferences.preferredCountry",
+)
+APPLICATION_PROJECTION = {
+    "_id": 0,
+    "applicationId": 1,
+    "userId": 1,
+    "status": 1,
+    "submitted_at": 1,
+    "educational.highestQualification.school": 1,
+    "studyPreferences": 1,
+}
+
+def _get_path(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _student_score(student: dict, q: str) -> float:
+    best = 0.0
+    for weight, field in zip((3.0, 2.0, 1.0), STUDENT_PREFIX_ORDER):
+        value = (student.get(field) or "").lower()
+        if value == q:
+            best = max(best, weight * 2)
+        elif value.startswith(q):
+            best = max(best, weight + len(q) / max(len(value), 1))
+    return best
+
+
+def _student_tiers(q: str) -> list[tuple[dict, str | None]]:
+    """
+    Disjoint queries in ranking order: exact matches on any field, then
+    prefix matches on email, name and phone, each excluding earlier tiers so
+    every student appears once and each tier is one collated index range.
+    """
+    upper = q + "\uffff"
+    exact = [{field: q} for field in STUDENT_FIELDS]
+    tiers = [({"roles": "student", "$or": exact}, None)]
+    for i, field in enumerate(STUDENT_PREFIX_ORDER):
+        earlier = [{other: {"$gte": q, "$lt": upper}} for other in STUDENT_PREFIX_ORDER[:i]]
+        tiers.append((
+            {"roles": "student", field: {"$gte": q, "$lt": upper}, "$nor": exact + earlier},
+            field
+        ))
+    return tiers
+
+
+async def search_students(q: str, skip: int, limit: int, projection: dict | None = None) -> tuple[list[dict], int]:
+    """
+    Case-insensitive prefix search over name, email and contact number, each
+    served by a collated index range scan. Exact matches rank first, then
+    email > name > phone prefixes, each in index order so shorter (closer)
+    matches come before longer ones. Paging and totals are done in Mongo.
+    """
+    results, total = [], 0
+    for query, sort_field in _student_tiers(q):
+        count = await users_collection.count_documents(query, collation=SEARCH_COLLATION)
+        total += count
+        if len(results) >= limit or skip >= count:
+            skip = max(0, skip - count)
+            continue
+
+        cursor = users_collection.find(query, {"_id": 0, **projection} if projection else STUDENT_PROJECTION) \
+            .collation(SEARCH_COLLATION)
+        if sort_field:
+            cursor = cursor.sort([(sort_field, 1)])
+        page_size = limit - len(results)
+        results.extend(await cursor.skip(skip).limit(page_size).to_list(length=page_size))
+        skip = 0
+
+    q = q.lower()
+    for student in results:
+        student["score"] = round(_student_score(student, q), 4)
+    return results, total
+
+
+async def search_applications(q: str, skip: int, limit: int, projection: dict | None = None) -> tuple[list[dict], int]:
+    query = {"$text": {"$search": q}}
+    results = await applications_collection.find(
+        query,
+        {**({"_id": 0, **projection} if projection else APPLICATION_PROJECTION), "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).skip(skip).limit(limit).to_list(length=limit)
+    total = await applications_collection.count_documents(query)
+    return results, total
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory fuzzy index for local deployments without text-index tuning.
+    Rebuilt from Mongo at most every `refresh_seconds`; scores by the share
+    of the query's trigrams present in a document.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._built_at = 0.0
+        self._postings: dict[str, dict[str, set]] = {}
+        self._documents: dict[str, dict] = {}
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _add(index: dict, documents: dict, kind: str, key: str, doc: dict, texts: list):
+        documents[key] = doc
+        postings = index.setdefault(kind, defaultdict(set))
+        for text in texts:
+            if text:
+                for gram in _trigrams(str(text)):
+                    postings[gram].add(key)
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._built_at >= self.refresh_seconds
+
+    async def _refresh(self):
+        """
+        Rebuilds into fresh structures and swaps them in at the end, so
+        searches keep using the previous index meanwhile; the lock makes
+        concurrent callers wait for one rebuild instead of starting their own.
+        """
+        if not self._stale():
+            return
+        async with self._lock:
+            if not self._stale():
+                return
+            postings, documents = {}, {}
+            async for student in users_collection.find({"roles": "student"}, STUDENT_PROJECTION):
+                self._add(postings, documents, "students", f"user:{student['userId']}", student,
+                          [student.get(field) for field in STUDENT_FIELDS])
+            async for application in applications_collection.find({}, APPLICATION_PROJECTION):
+                self._add(postings, documents, "applications", f"app:{application['applicationId']}", application,
+                          [_get_path(application, field) for field in APPLICATION_TEXT_FIELDS])
+            self._postings, self._documents = postings, documents
+            self._built_at = time.monotonic()
+
+    async def search(self, kind: str, q: str, skip: int, limit: int,
+                     projection: dict | None = None) -> tuple[list[dict], int]:
+        await self._refresh()
+        grams = _trigrams(q)
+        postings, documents = self._postings.get(kind, {}), self._documents
+        hits = defaultdict(int)
+        for gram in grams:
+            for key in postings.get(gram, ()):
+                hits[key] += 1
+        threshold = max(1, len(grams) // 2)
+        ranked = sorted(
+            ((count / len(grams), key) for key, count in hits.items() if count >= threshold),
+            reverse=True
+        )
+        results = [
+            {**(apply_projection(documents[key], projection) if projection else documents[key]),
+             "score": round(score, 4)}
+            for score, key in ranked[skip:skip + limit]
+        ]
+        return results, len(ranked)
+
+
+trigram_index = TrigramIndex(TRIGRAM_REFRESH_SECONDS) if SEARCH_BACKEND == "trigram" else None
+
+
+async def search(q: str, scope: str, page: int, limit: int,
+                 projections: dict[str, dict | None] | None = None) -> dict:
+    skip = (page - 1) * limit
+    response = {"query": q, "page": page, "limit": limit}
+    for kind, mongo_search in (("students", search_students), ("applications", search_applications)):
+        if scope not in (kind, "all"):
+            continue
+        projection = (projections or {}).get(kind)
+        if trigram_index is not None:
+            items, total = await trigram_index.search(kind, q, skip, limit, projection)
+        else:
+            items, total = await mongo_search(q, skip, limit, projection)
+        response[kind] = {"items": items, "total": total}
+    return response
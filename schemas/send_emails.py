@@ -1,9 +1,269 @@
+import asyncio
+import logging
 import smtplib
+import time
 from email.mime.text import MIMEText
-from config.getenv_var import email_address, email_password
+from config.getenv_var import (
+    email_address, email_password, MAIL_BACKEND, SMTP_HOST, SMTP_PORT,
+    SMTP_POOL_SIZE, MAIL_BATCH_SIZE, MAIL_MAX_RETRIES, MAIL_QUEUE_SIZE
+)
 
 RESET_TOKEN_EXPIRE_MINUTES = 60
 
+logger = logging.getLogger("ahatin.mail")
+
+
+class FakeSMTP:
+    """
+    In-process stand-in for smtplib.SMTP_SSL used for local and load testing.
+    Every message "sent" through any connection lands in `FakeSMTP.outbox`.
+    """
+
+    outbox: list = []
+    connections_opened = 0
+
+    def __init__(self, host: str = "", port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        FakeSMTP.connections_opened += 1
+
+    def login(self, user, password):
+        return (235, b"Authentication succeeded")
+
+    def noop(self):
+        return (250, b"OK")
+
+    def send_message(self, msg):
+        if self.latency:
+            time.sleep(self.latency)
+        FakeSMTP.outbox.append(msg)
+        return {}
+
+    def quit(self):
+        return (221, b"Bye")
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` authenticated SMTP connections open and hands them out
+    to senders, so a burst of messages does not pay a TLS handshake + login each.
+    All smtplib calls are blocking and are run in a thread.
+    """
+
+    def __init__(self, size: int = 2, backend: str = "smtp"):
+        self.size = max(1, size)
+        self.backend = backend
+        self._idle: asyncio.Queue | None = None
+
+    def _get_idle(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _connect(self):
+        if self.backend == "fake":
+            return FakeSMTP()
+        server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=30)
+        server.login(email_address, email_password)
+        return server
+
+    @staticmethod
+    def _is_alive(server) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    async def acquire(self):
+        server = await self._get_idle().get()
+        try:
+            if server is None or not await asyncio.to_thread(self._is_alive, server):
+                server = await asyncio.to_thread(self._connect)
+        except Exception:
+            self._get_idle().put_nowait(None)
+            raise
+        return server
+
+    def release(self, server, broken: bool = False):
+        if broken and server is not None:
+            try:
+                server.quit()
+            except Exception:
+                pass
+            server = None
+        self._get_idle().put_nowait(server)
+
+    async def close(self):
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            server = self._idle.get_nowait()
+            if server is not None:
+                try:
+                    await asyncio.to_thread(server.quit)
+                except Exception:
+                    pass
+        self._idle = None
+
+
+class MailQueue:
+    """
+    Outbound mail queue. Callers enqueue and return immediately; `workers`
+    background tasks drain the queue in batches of up to `batch_size`, send each
+    batch over one pooled connection, and retry failures with exponential backoff.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, batch_size: int = 20,
+                 max_retries: int = 3, maxsize: int = 1000, backoff: float = 1.0):
+        self.pool = pool
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.maxsize = maxsize
+        self.backoff = backoff
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        # Failed messages sleeping in backoff before being requeued.
+        self._retries: set[asyncio.Task] = set()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.pool.size)]
+
+    async def enqueue(self, msg: MIMEText):
+        self.start()
+        await self._queue.put((msg, 0))
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """5xx replies (e.g. unknown mailbox) will fail the same way on every retry."""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(code >= 500 for code, _ in error.recipients.values())
+        return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+    @classmethod
+    def _send_batch(cls, server, batch: list) -> tuple[list, list, bool]:
+        """
+        Returns (retryable, permanent, broken). Only a dropped connection or a
+        socket-level error marks the connection broken; an SMTP reply error
+        concerns that one message and the connection stays usable.
+        """
+        retryable, permanent = [], []
+        for i, (msg, attempt) in enumerate(batch):
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                retryable.extend(batch[i:])
+                return retryable, permanent, True
+            except smtplib.SMTPException as e:
+                if cls._is_permanent(e):
+                    permanent.append((msg, e))
+                else:
+                    retryable.append((msg, attempt))
+            except OSError:
+                retryable.extend(batch[i:])
+                return retryable, permanent, True
+            except Exception:
+                retryable.append((msg, attempt))
+        return retryable, permanent, False
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            self.batches += 1
+            broken = False
+            permanent = []
+            try:
+                server = await self.pool.acquire()
+            except Exception as e:
+                logger.error("Email connection failed: %s", e)
+                failures = batch
+            else:
+                try:
+                    failures, permanent, broken = await asyncio.to_thread(self._send_batch, server, batch)
+                finally:
+                    self.pool.release(server, broken=broken)
+
+            self.sent += len(batch) - len(failures) - len(permanent)
+            for msg, error in permanent:
+                self.failed += 1
+                logger.error("Email to %s rejected permanently: %s", msg["To"], error)
+            for msg, attempt in failures:
+                if attempt + 1 > self.max_retries:
+                    self.failed += 1
+                    logger.error("Email send failed after %d attempts: %s", attempt + 1, msg["To"])
+                else:
+                    self.retried += 1
+                    retry = asyncio.create_task(self._requeue(msg, attempt + 1))
+                    self._retries.add(retry)
+                    retry.add_done_callback(self._retries.discard)
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _requeue(self, msg: MIMEText, attempt: int):
+        await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+        await self._queue.put((msg, attempt))
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.pool.backend,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "retrying": len(self._retries),
+            "batches": self.batches,
+        }
+
+    async def drain(self, timeout: float | None = None):
+        """Waits until queued messages and pending retries have all been handled."""
+        if self._queue is None:
+            return
+
+        async def _drain():
+            while True:
+                await self._queue.join()
+                if not self._retries:
+                    return
+                await asyncio.gather(*list(self._retries), return_exceptions=True)
+
+        await asyncio.wait_for(_drain(), timeout)
+
+    async def stop(self, timeout: float | None = 10):
+        try:
+            await self.drain(timeout)
+        except asyncio.TimeoutError:
+            abandoned = len(self._retries) + (self._queue.qsize() if self._queue else 0)
+            self.failed += abandoned
+            logger.warning("Email queue stopped with %d unsent messages", abandoned)
+        for task in [*self._retries, *self._workers]:
+            task.cancel()
+        await asyncio.gather(*self._retries, *self._workers, return_exceptions=True)
+        self._retries.clear()
+        self._workers = []
+        await self.pool.close()
+
+
+mail_queue = MailQueue(
+    SMTPConnectionPool(size=SMTP_POOL_SIZE, backend=MAIL_BACKEND),
+    batch_size=MAIL_BATCH_SIZE,
+    max_retries=MAIL_MAX_RETRIES,
+    maxsize=MAIL_QUEUE_SIZE,
+)
+
+
 async def send_verification_email(to_email: str, code: str):
     subject = "Verify your email"
     body = f"Your verification code is: {code}"
@@ -13,13 +273,4 @@ async def send_verification_email(to_email: str, code: str):
     msg["From"] = email_address
     msg["To"] = to_email
 
-    smtp_server = "smtp.hostinger.com"
-    smtp_port = 465
-
-    try:
-        with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
-            server.login(email_address, email_password)
-            server.send_message(msg)
-            print('sent')
-    except Exception as e:
-        print(f"Email send failed: {e}")
\ No newline at end of file
+    await mail_queue.enqueue(msg)
@@ -0,0 +1,131 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from config.db import sessions_collection, users_collection
+from schemas.cache import TTLCache
+
+REVOCATION_CACHE_SIZE = 100000
+
+
+class SessionStore:
+    """
+    Refresh-token sessions, one Mongo document per refresh-token jti.
+
+    Each refresh consumes its session with a single compare-and-set and
+    issues a successor in the same family; presenting an already-consumed
+    token revokes the whole family (likely theft). Tokens consumed in this
+    process are remembered with their family, so a replay still revokes the
+    family without a Mongo lookup; only tokens whose family or user is already
+    revoked are rejected in O(1) without any write.
+    """
+
+    def __init__(self, refresh_ttl_seconds: int):
+        self.refresh_ttl_seconds = refresh_ttl_seconds
+        # jti -> family of refresh tokens already rotated by this process.
+        self._consumed_jtis = TTLCache(max_entries=REVOCATION_CACHE_SIZE, ttl_seconds=refresh_ttl_seconds)
+        self._revoked_families = TTLCache(max_entries=REVOCATION_CACHE_SIZE, ttl_seconds=refresh_ttl_seconds)
+        # email -> epoch seconds; refresh tokens issued before this are dead.
+        self._revoked_before = TTLCache(max_entries=REVOCATION_CACHE_SIZE, ttl_seconds=refresh_ttl_seconds)
+        self.rotations = 0
+        self.fast_rejections = 0
+        self.reuse_detected = 0
+
+    async def create(self, email: str, roles: list, family: str | None = None) -> dict:
+        jti = uuid.uuid4().hex
+        now = datetime.utcnow()
+        session = {
+            "_id": jti,
+            "family": family or jti,
+            "email": email,
+            "roles": roles,
+            "revoked": False,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.refresh_ttl_seconds),
+        }
+        await sessions_collection.insert_one(session)
+        return session
+
+    def _reject(self):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
+
+    def is_revoked_locally(self, claims: dict) -> bool:
+        if self._revoked_families.get(claims.get("fam")):
+            return True
+        revoked_before = self._revoked_before.get(claims.get("sub"))
+        return revoked_before is not None and claims.get("iat", 0) < revoked_before
+
+    async def rotate(self, claims: dict) -> dict:
+        """
+        Consumes the session behind a refresh token's claims and returns it,
+        or raises 401 if it was revoked, already used or expired.
+        """
+        if self.is_revoked_locally(claims):
+            self.fast_rejections += 1
+            self._reject()
+
+        jti = claims["jti"]
+        family = self._consumed_jtis.get(jti)
+        if family is not None:
+            self.reuse_detected += 1
+            await self.revoke_family(family)
+            self._reject()
+
+        session = await sessions_collection.find_one_and_update(
+            {"_id": jti, "revoked": False},
+            {"$set": {"revoked": True, "rotated_at": datetime.utcnow()}},
+            projection={"email": 1, "roles": 1, "family": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if session is None:
+            existing = await sessions_collection.find_one({"_id": jti}, {"family": 1, "rotated_at": 1})
+            if existing is not None and existing.get("rotated_at"):
+                self.reuse_detected += 1
+                await self.revoke_family(existing["family"])
+            self._reject()
+
+        self._consumed_jtis.set(jti, session["family"])
+        self.rotations += 1
+        return session
+
+    async def revoke_family(self, family: str):
+        self._revoked_families.set(family, True)
+        await sessions_collection.update_many({"family": family, "revoked": False}, {"$set": {"revoked": True}})
+
+    async def revoke_user(self, email: str):
+        """Ends every session of the user, e.g. after a password reset or deletion."""
+        await self.revoke_users([email])
+
+    async def revoke_users(self, emails: list[str]):
+        if not emails:
+            return
+        now = int(time.time())
+        for email in emails:
+            self._revoked_before.set(email, now)
+        await sessions_collection.update_many(
+            {"email": {"$in": emails}, "revoked": False},
+            {"$set": {"revoked": True}}
+        )
+        # Persisted for refresh tokens minted before session tracking, which
+        # have no session document to revoke.
+        await users_collection.update_many(
+            {"email": {"$in": emails}},
+            {"$set": {"sessions_revoked_at": datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None)}}
+        )
+
+    @staticmethod
+    def issued_before_revocation(claims: dict, user: dict) -> bool:
+        """True if an untracked refresh token predates the user's last revoke_users()."""
+        revoked_at = user.get("sessions_revoked_at")
+        if revoked_at is None:
+            return False
+        return claims.get("iat", 0) < revoked_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def metrics(self) -> dict:
+        return {
+            "rotations": self.rotations,
+            "fast_rejections": self.fast_rejections,
+            "reuse_detected": self.reuse_detected,
+            "consumed_jtis_cached": len(self._consumed_jtis),
+        }
@@ -0,0 +1,143 @@
+import copy
+import logging
+from collections import Counter
+from pymongo import ReplaceOne, UpdateOne
+from config.db import applications_collection, application_stats_collection
+
+# Dashboard dimension -> field path in the application document.
+STATS_DIMENSIONS = {
+    "status": "status",
+    "preferredCountry": "studyPreferences.preferredCountry",
+    "intakeYear": "studyPreferences.preferredIntakeYear",
+    "degreeLevel": "studyPreferences.degreeLevel",
+}
+
+STATS_PROJECTION = {path: 1 for path in STATS_DIMENSIONS.values()}
+
+UNKNOWN = "Unknown"
+
+logger = logging.getLogger("ahatin.stats")
+
+
+def _get_path(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def apply_dotted(doc: dict, to_set: dict, to_unset: list) -> dict:
+    """Returns a copy of `doc` with dotted $set/$unset paths applied."""
+    doc = copy.deepcopy(doc)
+    for path, value in to_set.items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for part in parents:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[leaf] = value
+    for path in to_unset:
+        *parents, leaf = path.split(".")
+        target = doc
+        for part in parents:
+            target = target.get(part) if isinstance(target, dict) else None
+        if isinstance(target, dict):
+            target.pop(leaf, None)
+    return doc
+
+
+def _bucket(doc: dict, path: str) -> str:
+    value = _get_path(doc, path)
+    return str(value) if value not in (None, "") else UNKNOWN
+
+
+async def apply_stats_changes(changes: list[tuple[dict | None, dict | None]]):
+    """
+    Applies (before, after) pairs to the summary counters in one bulk_write.
+    `before` is None for inserts and `after` is None for deletes. Failures are
+    logged rather than raised: the write they describe has already happened,
+    and rebuild_stats() reconciles any drift.
+    """
+    deltas = Counter()
+    for before, after in changes:
+        for dimension, path in STATS_DIMENSIONS.items():
+            old = _bucket(before, path) if before is not None else None
+            new = _bucket(after, path) if after is not None else None
+            if old == new:
+                continue
+            if old is not None:
+                deltas[(dimension, old)] -= 1
+            if new is not None:
+                deltas[(dimension, new)] += 1
+
+    operations = [
+        UpdateOne(
+            {"_id": f"{dimension}:{value}"},
+            {"$inc": {"count": delta}, "$setOnInsert": {"dimension": dimension, "value": value}},
+            upsert=True
+        )
+        for (dimension, value), delta in deltas.items() if delta
+    ]
+    if operations:
+        try:
+            await application_stats_collection.bulk_write(operations, ordered=False)
+        except Exception:
+            logger.exception("Failed to update application stats")
+
+
+async def get_stats() -> dict:
+    stats = {dimension: {} for dimension in STATS_DIMENSIONS}
+    async for doc in application_stats_collection.find({"count": {"$gt": 0}}):
+        stats.setdefault(doc["dimension"], {})[doc["value"]] = doc["count"]
+    stats["total"] = sum(stats["status"].values())
+    return stats
+
+
+async def rebuild_stats() -> dict:
+    """
+    Recomputes every counter from the applications collection with a single
+    $facet aggregation. Counters are replaced with upserts and stale ones
+    deleted afterwards, so concurrent apply_stats_changes calls never see the
+    summary collection empty or collide with an insert.
+    """
+    facets = {
+        dimension: [
+            {"$group": {
+                "_id": {"$ifNull": [f"${path}", UNKNOWN]},
+                "count": {"$sum": 1},
+            }},
+        ]
+        for dimension, path in STATS_DIMENSIONS.items()
+    }
+    result = await applications_collection.aggregate([
+        {"$project": STATS_PROJECTION},
+        {"$facet": facets},
+    ]).to_list(length=1)
+
+    counts = Counter()
+    for dimension, groups in (result[0] if result else {}).items():
+        for group in groups:
+            value = str(group["_id"]) if group["_id"] not in (None, "") else UNKNOWN
+            counts[(dimension, value)] += group["count"]
+    ids = [f"{dimension}:{value}" for dimension, value in counts]
+    operations = [
+        ReplaceOne({"_id": stat_id}, {"dimension": dimension, "value": value, "count": count}, upsert=True)
+        for stat_id, ((dimension, value), count) in zip(ids, counts.items())
+    ]
+
+    if operations:
+        await application_stats_collection.bulk_write(operations, ordered=False)
+    await application_stats_collection.delete_many({"_id": {"$nin": ids}})
+    return await get_stats()
+
+
+async def seed_stats():
+    """
+    Builds the counters on first start against an existing applications
+    collection; incremental updates alone would drive old buckets negative.
+    """
+    if await application_stats_collection.find_one({}, {"_id": 1}) is None:
+        await rebuild_stats()
@@ -0,0 +1,88 @@
+import json
+import time
+import jwt
+from jwt.algorithms import get_default_algorithms
+from jwt.exceptions import InvalidTokenError
+from config.getenv_var import SECRET_KEY, ALGORITHM, JWT_KEYS, JWT_ACTIVE_KID, JWT_CLAIMS_CACHE_SIZE
+from schemas.cache import TTLCache
+
+DEFAULT_KID = "default"
+
+
+class SigningKey:
+    """One JWT key with its signing and verification keys prepared up front."""
+
+    def __init__(self, kid: str, algorithm: str, signing_key, verifying_key):
+        implementation = get_default_algorithms()[algorithm]
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = implementation.prepare_key(signing_key) if signing_key is not None else None
+        self.verifying_key = implementation.prepare_key(verifying_key)
+
+    @classmethod
+    def from_config(cls, kid: str, config: dict) -> "SigningKey":
+        algorithm = config.get("alg", "HS256")
+        if "secret" in config:
+            return cls(kid, algorithm, config["secret"], config["secret"])
+        private_key = None
+        if config.get("private_key_file"):
+            with open(config["private_key_file"], "rb") as f:
+                private_key = f.read()
+        with open(config["public_key_file"], "rb") as f:
+            public_key = f.read()
+        return cls(kid, algorithm, private_key, public_key)
+
+
+class TokenService:
+    """
+    Signs with the active key and verifies with any configured key chosen by
+    the token's `kid` header, so keys can be rotated without logging users
+    out. Tokens without a kid (issued before rotation support) use the
+    "default" key. Validated claims are cached per token until it expires.
+    """
+
+    def __init__(self, keys: dict[str, SigningKey], active_kid: str, cache_size: int = 10000):
+        if active_kid not in keys or keys[active_kid].signing_key is None:
+            raise ValueError(f"Active JWT key '{active_kid}' is missing or has no private key")
+        self.keys = keys
+        self.active = keys[active_kid]
+        self._claims = TTLCache(max_entries=cache_size, ttl_seconds=24 * 3600)
+
+    def encode(self, payload: dict) -> str:
+        return jwt.encode(
+            payload,
+            self.active.signing_key,
+            algorithm=self.active.algorithm,
+            headers={"kid": self.active.kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        """Returns a copy of the verified claims; raises InvalidTokenError."""
+        claims = self._claims.get(token)
+        if claims is not None:
+            if claims.get("exp", 0) > time.time():
+                return dict(claims)
+            self._claims.pop(token)
+
+        kid = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+        key = self.keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown key id '{kid}'")
+        claims = jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            self._claims.set(token, claims, ttl_seconds=ttl)
+        return dict(claims)
+
+    def metrics(self) -> dict:
+        return self._claims.metrics()
+
+
+def _load_keys() -> dict[str, SigningKey]:
+    if JWT_KEYS:
+        return {kid: SigningKey.from_config(kid, config) for kid, config in json.loads(JWT_KEYS).items()}
+    return {DEFAULT_KID: SigningKey(DEFAULT_KID, ALGORITHM or "HS256", SECRET_KEY, SECRET_KEY)}
+
+
+token_service = TokenService(_load_keys(), JWT_ACTIVE_KID if JWT_KEYS else DEFAULT_KID, JWT_CLAIMS_CACHE_SIZE)
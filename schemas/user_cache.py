@@ -0,0 +1,56 @@
+from models.auth_models import UserInDB
+from schemas.cache import TTLCache
+from config.getenv_var import USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES
+
+
+class UserCache(TTLCache):
+    """
+    Resolved users for get_current_user, keyed by (subject, token).
+    Keeps a reverse index by email and userId so writes to a user can drop
+    every cached token for that user.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._by_email: dict[str, set] = {}
+        self._by_user_id: dict[str, set] = {}
+        self.invalidations = 0
+
+    def set(self, key, value: UserInDB, ttl_seconds: float | None = None):
+        super().set(key, value, ttl_seconds)
+        if key in self._data:
+            self._by_email.setdefault(value.email, set()).add(key)
+            self._by_user_id.setdefault(value.userId, set()).add(key)
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        user = entry[1]
+        for index, field in ((self._by_email, user.email), (self._by_user_id, user.userId)):
+            keys = index.get(field)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[field]
+
+    def invalidate(self, email: str | None = None, user_id: str | None = None):
+        keys = set()
+        if email is not None:
+            keys |= self._by_email.get(email, set())
+        if user_id is not None:
+            keys |= self._by_user_id.get(user_id, set())
+        for key in keys:
+            self._remove(key)
+        self.invalidations += 1
+
+    def clear(self):
+        super().clear()
+        self._by_email.clear()
+        self._by_user_id.clear()
+
+    def metrics(self) -> dict:
+        return {**super().metrics(), "invalidations": self.invalidations}
+
+
+user_cache = UserCache(max_entries=USER_CACHE_MAX_ENTRIES, ttl_seconds=USER_CACHE_TTL_SECONDS)
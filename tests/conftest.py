@@ -0,0 +1,8 @@
+import os
+
+# The suite runs against the in-process mongomock backend used by benchmarks/
+# (install requirements-dev.txt).
+os.environ["MONGO_URL"] = "mongomock://localhost"
+os.environ["MAIL_BACKEND"] = "fake"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
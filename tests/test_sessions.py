@@ -0,0 +1,48 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from config.db import users_collection
+from schemas.sessions import SessionStore
+
+
+def claims_for(session: dict) -> dict:
+    return {"sub": session["email"], "jti": session["_id"], "fam": session["family"], "iat": 0}
+
+
+def test_replayed_refresh_token_revokes_successor():
+    async def scenario():
+        store = SessionStore(refresh_ttl_seconds=3600)
+        first = await store.create("student@example.com", ["student"])
+
+        rotated = await store.rotate(claims_for(first))
+        successor = await store.create(rotated["email"], rotated["roles"], rotated["family"])
+
+        # Replaying the consumed token on the same worker is reuse...
+        with pytest.raises(HTTPException) as replay:
+            await store.rotate(claims_for(first))
+        assert replay.value.status_code == 401
+
+        # ...so the token issued by the legitimate rotation is dead too.
+        with pytest.raises(HTTPException) as refresh:
+            await store.rotate(claims_for(successor))
+        assert refresh.value.status_code == 401
+        assert store.reuse_detected == 1
+
+    asyncio.run(scenario())
+
+
+def test_untracked_refresh_token_is_rejected_after_revocation():
+    async def scenario():
+        store = SessionStore(refresh_ttl_seconds=3600)
+        legacy_claims = {"sub": "legacy@example.com", "iat": 1}
+        await users_collection.insert_one({"_id": "legacy", "email": "legacy@example.com", "roles": ["student"]})
+        user = await users_collection.find_one({"email": "legacy@example.com"})
+        assert not store.issued_before_revocation(legacy_claims, user)
+
+        await store.revoke_user("legacy@example.com")
+        user = await users_collection.find_one({"email": "legacy@example.com"})
+        assert store.issued_before_revocation(legacy_claims, user)
+        assert not store.issued_before_revocation({**legacy_claims, "iat": int(time.time()) + 1}, user)
+
+    asyncio.run(scenario())